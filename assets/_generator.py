@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+NSE DataSync Pro - Shared Asset Generator
+Icon rendering and file writing used by create_assets.py,
+update_icon.py and create_simple_assets.py
+"""
+
+import functools
+import hashlib
+import io
+import json
+import os
+import struct
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+
+# Optional import with graceful fallback; create_simple_assets.py runs without Pillow
+try:
+    import PIL
+    from PIL import Image, ImageDraw, ImageFont
+    HAS_PIL = True
+    # Pillow-SIMD releases carry a ".postN" suffix; its resample kernels are
+    # vectorized for 4-channel (RGBA) 8-bit images
+    HAS_PILLOW_SIMD = ".post" in PIL.__version__
+except ImportError:
+    HAS_PIL = False
+    HAS_PILLOW_SIMD = False
+
+ASSETS_DIR = Path(__file__).resolve().parent
+
+# Professional color scheme
+PRIMARY_COLOR = (0, 102, 204)    # Professional blue
+ACCENT_COLOR = (255, 165, 0)     # Gold accent
+TEXT_COLOR = (255, 255, 255)     # White text
+DEFAULT_PALETTE = (PRIMARY_COLOR, ACCENT_COLOR, TEXT_COLOR)
+
+ICON_FONT = "arial.ttf"
+# Shipped with the assets so text never falls back to Pillow's bitmap font
+BUNDLED_FONT = ASSETS_DIR / "DejaVuSans.ttf"
+
+# Default font for Linux when fontconfig is unavailable
+LINUX_FALLBACK_FONT = "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf"
+
+# Write buffer for asset files; icons are small enough to go out in one write
+WRITE_BUFFER_SIZE = 1 << 18
+
+# Images up to this size bypass Pillow's PNG encoder
+RAW_PNG_MAX_SIZE = 64
+PNG_COLOR_TYPES = {'RGB': (2, 3), 'RGBA': (6, 4)}
+
+# The background circle is rasterized once at this size and downsampled;
+# it matches the largest ICNS entry so no render is upscaled
+CIRCLE_MASTER_SIZE = 1024
+# Outline width on the master; 2px at 64x64 like the hand-drawn icons
+CIRCLE_MASTER_OUTLINE = 32
+
+MANIFEST_NAME = ".icon_cache.json"
+
+ICON_INFO = """\
+NSE DataSync Pro - Professional Icons
+=====================================
+
+Icon files needed for professional appearance:
+- nse_icon.ico (Windows desktop shortcut)
+- nse_icon.png (Application icon)
+- splash_screen.png (Loading screen)
+
+Note: Install Pillow to generate actual icon files:
+pip install Pillow
+python create_assets.py
+"""
+
+def write_icon_info(path):
+    """Write the informational text shown when Pillow is not installed"""
+    with open(path, 'w', encoding='utf-8', buffering=8192) as f:
+        f.write(ICON_INFO)
+
+def _fc_match(family):
+    """Resolve a font family to a file through fontconfig"""
+    try:
+        result = subprocess.run(['fc-match', '-f', '%{file}', family],
+                                capture_output=True, text=True, timeout=5)
+        if result.returncode == 0 and result.stdout:
+            return result.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return LINUX_FALLBACK_FONT
+
+@functools.lru_cache(maxsize=None)
+def system_font_path():
+    """System Arial (or closest match), resolved once per platform"""
+    return {
+        'win32': "C:/Windows/Fonts/arial.ttf",
+        'darwin': "/System/Library/Fonts/Arial.ttf",
+    }.get(sys.platform) or _fc_match('Arial')
+
+def _png_chunk(tag, data):
+    """Length-prefixed, CRC-terminated PNG chunk"""
+    return (struct.pack('>I', len(data)) + tag + data
+            + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+def encode_png_raw(img):
+    """Encode an 8-bit RGB/RGBA image as PNG with filter type 0 on every row"""
+    color_type, channels = PNG_COLOR_TYPES[img.mode]
+    width, height = img.size
+    pixels = img.tobytes()
+    stride = width * channels
+    compressor = zlib.compressobj(1)
+    idat = []
+    for y in range(height):
+        # Each scanline is prefixed with its filter byte (0 = None)
+        idat.append(compressor.compress(b'\x00' + pixels[y * stride:(y + 1) * stride]))
+    idat.append(compressor.flush())
+    return (b'\x89PNG\r\n\x1a\n'
+            + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+            + _png_chunk(b'IDAT', b''.join(idat))
+            + _png_chunk(b'IEND', b''))
+
+def encode_png(img):
+    """Encode an image as PNG bytes with the cheapest encoder that fits"""
+    if img.mode in PNG_COLOR_TYPES and max(img.size) <= RAW_PNG_MAX_SIZE:
+        # Small icons: the per-row filter search costs more than the pixels
+        return encode_png_raw(img)
+    buffer = io.BytesIO()
+    # compress_level=1 skips zlib's expensive search; icons are tiny
+    img.save(buffer, 'PNG', optimize=False, compress_level=1, pnginfo=None)
+    return buffer.getvalue()
+
+def write_bytes(path, data):
+    """Write a file through a single buffered handle"""
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as fh:
+        fh.write(data)
+
+def save_png(img, path):
+    """Save an image as PNG through a single buffered file handle"""
+    write_bytes(path, encode_png(img))
+
+def save_ico(images, path):
+    """Serialize a multi-size ICO in memory and write it out in one call"""
+    # Pillow drops ICO sizes larger than the primary image and resamples the
+    # primary for any size not supplied, so lead with the largest image and
+    # pass the rest through append_images to embed them as-is
+    images = sorted(images, key=lambda img: img.width, reverse=True)
+    buffer = io.BytesIO()
+    images[0].save(buffer, format='ICO', append_images=images[1:],
+                   sizes=[(img.width, img.height) for img in images])
+    write_bytes(path, buffer.getvalue())
+
+def resample_filter(size):
+    """Cheapest filter that holds up at the target size: BOX for tiny icons"""
+    return Image.Resampling.BOX if size <= 32 else Image.Resampling.LANCZOS
+
+def file_mtime(path):
+    """Modification time of path, or None if it cannot be stat'ed"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def inputs_key(*parts):
+    """Hash the generator inputs into a manifest key"""
+    # This module is an input too: rendering changes must rebuild
+    parts = parts + (file_mtime(__file__),)
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+def load_manifest(assets_dir):
+    """Read the asset manifest, returning an empty dict if missing or corrupt"""
+    try:
+        with open(Path(assets_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def output_digest(path):
+    """SHA-256 of a generated file, or None if it cannot be read"""
+    try:
+        with open(path, 'rb') as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+    except OSError:
+        return None
+
+def is_up_to_date(assets_dir, name, key, outputs):
+    """True if the manifest entry matches key and no output changed since it was written
+    
+    The generators share some output names, so an output that merely exists
+    may be another script's artwork.
+    """
+    entry = load_manifest(assets_dir).get(name)
+    if not isinstance(entry, dict) or entry.get('key') != key:
+        return False
+    digests = entry.get('outputs', {})
+    return all(digests.get(output) is not None
+               and digests.get(output) == output_digest(Path(assets_dir) / output)
+               for output in outputs)
+
+def record_manifest(assets_dir, name, key, outputs):
+    """Store the inputs key for a generator step, with a digest of each output"""
+    manifest = load_manifest(assets_dir)
+    manifest[name] = {
+        'key': key,
+        'outputs': {output: output_digest(Path(assets_dir) / output) for output in outputs},
+    }
+    with open(Path(assets_dir) / MANIFEST_NAME, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+
+def measure_text(font, text):
+    """Return (width, height) of text: advance width, and the ink height textbbox gave"""
+    width = int(font.getlength(text))
+    # Same box as draw.textbbox((0, 0), ...), so vertical centering is unchanged
+    left, top, right, bottom = font.getbbox(text)
+    return width, bottom - top
+
+def resolve_font_path(font_path):
+    """File a font name actually loads from: Pillow searches the system font
+    directories for bare names like "arial.ttf"; the bundled font otherwise"""
+    try:
+        return ImageFont.truetype(font_path, 8).path
+    except OSError:
+        return str(BUNDLED_FONT)
+
+def fallback_font(size):
+    """Bundled TrueType font used when the preferred font is unavailable"""
+    try:
+        return ImageFont.truetype(str(BUNDLED_FONT), size)
+    except OSError:
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=None)
+def load_base_font(font_path):
+    """Parse a font face once per process; sized fonts are derived with font_variant"""
+    try:
+        return ImageFont.truetype(font_path, 64)
+    except:
+        return fallback_font(64)
+
+@functools.lru_cache(maxsize=None)
+def circle_master(palette=DEFAULT_PALETTE):
+    """Rasterize the background circle once at master resolution"""
+    primary_color, accent_color, text_color = palette
+    master = Image.new('RGBA', (CIRCLE_MASTER_SIZE, CIRCLE_MASTER_SIZE), (0, 0, 0, 0))
+    margin = 4
+    ImageDraw.Draw(master).ellipse(
+        [margin, margin, CIRCLE_MASTER_SIZE - margin, CIRCLE_MASTER_SIZE - margin],
+        fill=primary_color, outline=accent_color, width=CIRCLE_MASTER_OUTLINE)
+    return master
+
+def circle_tile(size, palette=DEFAULT_PALETTE):
+    """Background circle at the given size, downsampled from the master"""
+    master = circle_master(palette)
+    if CIRCLE_MASTER_SIZE % size == 0:
+        # Integer factor: plain box average
+        return master.reduce(CIRCLE_MASTER_SIZE // size)
+    return master.resize((size, size), resample_filter(size))
+
+def _draw_icon(size, palette, font_path):
+    """Draw the NSE icon at one size"""
+    primary_color, accent_color, text_color = palette
+
+    # Start from the shared background circle
+    img = circle_tile(size, palette)
+    draw = ImageDraw.Draw(img)
+
+    # Draw NSE text or symbol
+    if size >= 32:
+        base_font = load_base_font(font_path)
+        if isinstance(base_font, ImageFont.FreeTypeFont):
+            font = base_font.font_variant(size=max(8, size // 4))
+        else:
+            # Bitmap default font, only if the bundled font is missing too
+            font = base_font
+
+        # Draw "NSE" text
+        if size >= 48:
+            text = "NSE"
+            text_width, text_height = measure_text(font, text)
+
+            x = (size - text_width) // 2
+            y = (size - text_height) // 2 - 2
+
+            draw.text((x, y), text, fill=text_color, font=font)
+        else:
+            # Draw simple "N" for smaller sizes
+            text = "N"
+            text_width, text_height = measure_text(font, text)
+
+            x = (size - text_width) // 2
+            y = (size - text_height) // 2
+
+            draw.text((x, y), text, fill=text_color, font=font)
+    else:
+        # For very small sizes, draw a simple symbol
+        center = size // 2
+        radius = size // 4
+        draw.ellipse([center-radius, center-radius, center+radius, center+radius],
+                    fill=accent_color)
+
+    return img
+
+def render_icon_png(size, palette=DEFAULT_PALETTE, font_path=ICON_FONT):
+    """Render the NSE icon at one size as PNG bytes"""
+    return encode_png(_draw_icon(size, palette, font_path))
+
+def create_nse_icon(font_path=None):
+    """Create the 512x512 NSE DataSync Pro base icon on a white background"""
+    # Create a 512x512 canvas with blue gradient background
+    size = 512
+    img = Image.new('RGB', (size, size), color='white')
+    draw = ImageDraw.Draw(img)
+
+    # Create blue gradient circle
+    center = size // 2
+
+    # Draw the blue circle background
+    draw.ellipse([10, 10, size-10, size-10], fill='#1E90FF', outline=None)
+
+    # Try to use a system font for text
+    try:
+        main_font = ImageFont.truetype(font_path or system_font_path(), 90)
+        sub_font = main_font.font_variant(size=55)
+    except:
+        main_font = fallback_font(90)
+        sub_font = fallback_font(55)
+
+    # Draw "NSE" text
+    nse_text = "NSE"
+    nse_width = int(main_font.getlength(nse_text))
+    nse_x = (size - nse_width) // 2
+    nse_y = center - 80
+
+    draw.text((nse_x, nse_y), nse_text, fill='white', font=main_font)
+
+    # Draw "DataSync Pro" text
+    datasync_text = "DataSync Pro"
+    datasync_width = int(sub_font.getlength(datasync_text))
+    datasync_x = (size - datasync_width) // 2
+    datasync_y = center + 20
+
+    draw.text((datasync_x, datasync_y), datasync_text, fill='white', font=sub_font)
+
+    return img
@@ -3,6 +3,14 @@
 Simple icon creator - creates basic professional icons without external dependencies
 """
 
+import sys
+from pathlib import Path
+
+# Import the shared generator whatever the working directory
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _generator import write_icon_info
+
 # Create a simple text-based icon representation
 icon_data = {
     'nse_icon.ico': 'Professional NSE DataSync Pro Icon',
@@ -11,16 +19,7 @@ icon_data = {
 }
 
 # Create icon info file
-with open('assets/icon_info.txt', 'w') as f:
-    f.write("NSE DataSync Pro - Professional Icons\n")
-    f.write("=====================================\n\n")
-    f.write("Icon files needed for professional appearance:\n")
-    f.write("- nse_icon.ico (Windows desktop shortcut)\n")
-    f.write("- nse_icon.png (Application icon)\n")
-    f.write("- splash_screen.png (Loading screen)\n\n")
-    f.write("Note: Install Pillow to generate actual icon files:\n")
-    f.write("pip install Pillow\n")
-    f.write("python create_assets.py\n")
+write_icon_info('assets/icon_info.txt')
 
 print("Icon info file created in assets/icon_info.txt")
 print("To create actual icons, install Pillow and run create_assets.py")
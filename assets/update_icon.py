@@ -4,118 +4,72 @@ Update NSE DataSync Pro Icons
 Generates all required icon formats from the base design
 """
 
-from PIL import Image, ImageDraw, ImageFont
-import os
+import sys
 from pathlib import Path
 
-def create_nse_icon():
-    """Create the NSE DataSync Pro icon"""
-    # Create a 512x512 canvas with blue gradient background
-    size = 512
-    img = Image.new('RGB', (size, size), color='white')
-    draw = ImageDraw.Draw(img)
-    
-    # Create blue gradient circle
-    center = size // 2
-    radius = size // 2 - 10
-    
-    # Draw the blue circle background
-    draw.ellipse([10, 10, size-10, size-10], fill='#1E90FF', outline=None)
-    
-    # Try to use a system font for text
-    try:
-        # Try different font paths
-        font_paths = [
-            "C:/Windows/Fonts/arial.ttf",
-            "C:/Windows/Fonts/calibri.ttf", 
-            "/System/Library/Fonts/Arial.ttf",
-            "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf"
-        ]
-        
-        main_font = None
-        sub_font = None
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    main_font = ImageFont.truetype(font_path, 90)
-                    sub_font = ImageFont.truetype(font_path, 55)
-                    break
-                except:
-                    continue
-        
-        if main_font is None:
-            main_font = ImageFont.load_default()
-            sub_font = ImageFont.load_default()
-            
-    except:
-        main_font = ImageFont.load_default()
-        sub_font = ImageFont.load_default()
-    
-    # Draw "NSE" text
-    nse_text = "NSE"
-    nse_bbox = draw.textbbox((0, 0), nse_text, font=main_font)
-    nse_width = nse_bbox[2] - nse_bbox[0]
-    nse_height = nse_bbox[3] - nse_bbox[1]
-    nse_x = (size - nse_width) // 2
-    nse_y = center - 80
-    
-    draw.text((nse_x, nse_y), nse_text, fill='white', font=main_font)
-    
-    # Draw "DataSync Pro" text
-    datasync_text = "DataSync Pro"
-    datasync_bbox = draw.textbbox((0, 0), datasync_text, font=sub_font)
-    datasync_width = datasync_bbox[2] - datasync_bbox[0]
-    datasync_height = datasync_bbox[3] - datasync_bbox[1]
-    datasync_x = (size - datasync_width) // 2
-    datasync_y = center + 20
-    
-    draw.text((datasync_x, datasync_y), datasync_text, fill='white', font=sub_font)
-    
-    return img
+# Import the shared generator whatever the working directory
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from _generator import (
+    ASSETS_DIR, HAS_PILLOW_SIMD, create_nse_icon, file_mtime, inputs_key, is_up_to_date,
+    record_manifest, resample_filter, save_ico, save_png, system_font_path,
+)
+
+# Icon sizes to create
+SIZES = [16, 24, 32, 48, 64, 128, 256]
 
 def main():
     """Generate all icon formats"""
     print("Creating NSE DataSync Pro icon...")
+    if not HAS_PILLOW_SIMD:
+        print("Tip: install pillow-simd for faster icon resizing")
+    
+    # Skip the rebuild when nothing that feeds the icons has changed. Outputs
+    # and manifest live in the assets directory whatever the working directory
+    outputs = ['icon.png', 'nse_icon.png', 'nse_icon.ico'] + [f'nse_icon_{size}x{size}.png' for size in SIZES]
+    font_path = system_font_path()
+    key = inputs_key(tuple(SIZES), font_path, file_mtime(font_path), file_mtime(__file__))
+    if is_up_to_date(ASSETS_DIR, 'update_icon', key, outputs):
+        print("✅ Icons are up to date")
+        return
     
-    # Create the base icon
-    base_icon = create_nse_icon()
+    # Create the base icon. It sits on an opaque white background, so keep
+    # it 3-channel: the resize chain then moves 25% less data than RGBA
+    base_icon = create_nse_icon(font_path)
+    if base_icon.mode != 'RGB':
+        base_icon = base_icon.convert('RGB')
     
     # Save as main icon
-    base_icon.save('icon.png', 'PNG')
+    save_png(base_icon, ASSETS_DIR / 'icon.png')
     print("✅ Created icon.png")
     
     # Save as nse_icon.png (what the launcher expects)
-    base_icon.save('nse_icon.png', 'PNG')
+    save_png(base_icon, ASSETS_DIR / 'nse_icon.png')
     print("✅ Created nse_icon.png")
     
-    # Create different sizes
-    sizes = [16, 24, 32, 48, 64, 128, 256]
-    for size in sizes:
-        resized = base_icon.resize((size, size), Image.Resampling.LANCZOS)
-        resized.save(f'nse_icon_{size}x{size}.png', 'PNG')
+    # Create different sizes, largest first: each size is downscaled from
+    # the previous one instead of from the 512x512 master
+    resized_icons = {}
+    prev = base_icon
+    for size in sorted(SIZES, reverse=True):
+        prev = prev.resize((size, size), resample_filter(size))
+        resized_icons[size] = prev
+        save_png(prev, ASSETS_DIR / f'nse_icon_{size}x{size}.png')
         print(f"✅ Created nse_icon_{size}x{size}.png")
     
     # Create ICO file for Windows
     try:
-        # Create multiple sizes for ICO
+        # Reuse the already resized images for the ICO entries
         ico_sizes = [16, 32, 48, 128, 256]
-        ico_images = []
-        for size in ico_sizes:
-            ico_images.append(base_icon.resize((size, size), Image.Resampling.LANCZOS))
+        ico_images = [resized_icons[size] for size in ico_sizes]
         
         # Save as ICO
-        ico_images[0].save('nse_icon.ico', format='ICO', sizes=[(img.width, img.height) for img in ico_images])
+        save_ico(ico_images, ASSETS_DIR / 'nse_icon.ico')
         print("✅ Created nse_icon.ico")
+        record_manifest(ASSETS_DIR, 'update_icon', key, outputs)
         
     except Exception as e:
-        print(f"⚠️  Could not create ICO file: {e}")
-        # Fallback: save largest PNG as ICO
-        try:
-            base_icon.resize((256, 256), Image.Resampling.LANCZOS).save('nse_icon.ico', 'ICO')
-            print("✅ Created nse_icon.ico (fallback)")
-        except:
-            print("❌ Failed to create ICO file")
+        print(f"❌ Failed to create ICO file: {e}")
     
     print("\n🎉 Icon generation complete!")
     print("The launcher will now use the new NSE DataSync Pro icon for desktop shortcuts.")
@@ -5,9 +5,35 @@ NSE DataSync Pro - Icon Generator
 Creates professional icons for the application
 """
 
-from PIL import Image, ImageDraw, ImageFont
+import io
 import os
+import sys
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Import the shared generator whatever the working directory
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from assets._generator import (
+    HAS_PILLOW_SIMD, PRIMARY_COLOR, ACCENT_COLOR, TEXT_COLOR, ICON_FONT,
+    CIRCLE_MASTER_SIZE, CIRCLE_MASTER_OUTLINE, fallback_font, file_mtime,
+    inputs_key, is_up_to_date, record_manifest, render_icon_png, resolve_font_path,
+    save_ico, save_png, write_bytes,
+)
+
+# Sizes Pillow writes into an ICNS; 16, 24 and 48 have no ICNS entry
+ICNS_SIZES = [32, 64, 128, 256, 512, 1024]
+
+def _render_size(args):
+    """Render the icon at one size, saving it when assets_dir is given; runs in a worker process"""
+    size, font_path, assets_dir = args
+    data = render_icon_png(size, (PRIMARY_COLOR, ACCENT_COLOR, TEXT_COLOR), font_path)
+    png_path = None
+    if assets_dir is not None:
+        png_path = Path(assets_dir) / f"nse_icon_{size}x{size}.png"
+        write_bytes(png_path, data)
+    return size, data, png_path
 
 def create_professional_icon():
     """Create a professional NSE DataSync Pro icon"""
@@ -15,94 +41,97 @@ def create_professional_icon():
     # Icon sizes to create
     sizes = [16, 24, 32, 48, 64, 128, 256]
     
+    if not HAS_PILLOW_SIMD:
+        print("Tip: install pillow-simd for faster icon resizing")
+    
     # Create assets directory
     assets_dir = Path("assets")
     assets_dir.mkdir(exist_ok=True)
     
-    for size in sizes:
-        # Create image
-        img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Professional color scheme
-        primary_color = (0, 102, 204)    # Professional blue
-        accent_color = (255, 165, 0)     # Gold accent
-        text_color = (255, 255, 255)     # White text
-        
-        # Draw background circle
-        margin = 2
-        draw.ellipse([margin, margin, size-margin, size-margin], 
-                    fill=primary_color, outline=accent_color, width=2)
-        
-        # Draw NSE text or symbol
-        if size >= 32:
-            try:
-                # Try to load a font
-                font_size = max(8, size // 4)
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                # Fallback to default font
-                font = ImageFont.load_default()
-            
-            # Draw "NSE" text
-            if size >= 48:
-                text = "NSE"
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                
-                x = (size - text_width) // 2
-                y = (size - text_height) // 2 - 2
-                
-                draw.text((x, y), text, fill=text_color, font=font)
-            else:
-                # Draw simple "N" for smaller sizes
-                text = "N"
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                
-                x = (size - text_width) // 2
-                y = (size - text_height) // 2
-                
-                draw.text((x, y), text, fill=text_color, font=font)
-        else:
-            # For very small sizes, draw a simple symbol
-            center = size // 2
-            radius = size // 4
-            draw.ellipse([center-radius, center-radius, center+radius, center+radius], 
-                        fill=accent_color)
-        
-        # Save PNG
-        png_path = assets_dir / f"nse_icon_{size}x{size}.png"
-        img.save(png_path, 'PNG')
-        print(f"Created {png_path}")
+    # Skip the rebuild when nothing that feeds the icons has changed
+    outputs = [f"nse_icon_{size}x{size}.png" for size in sizes] + ["nse_icon.ico", "nse_icon.icns", "nse_icon.png"]
+    font_file = resolve_font_path(ICON_FONT)
+    key = inputs_key(tuple(sizes), tuple(ICNS_SIZES), PRIMARY_COLOR, ACCENT_COLOR, TEXT_COLOR,
+                     CIRCLE_MASTER_SIZE, CIRCLE_MASTER_OUTLINE,
+                     font_file, file_mtime(font_file), file_mtime(__file__))
+    if is_up_to_date(assets_dir, "icon", key, outputs):
+        print("Icons are up to date")
+        return
+    complete = True
+    
+    # Every size is independent, so render them in parallel worker processes,
+    # and keep the results in memory for the ICO, ICNS and main icon. The
+    # ICNS-only sizes are not saved as separate PNGs
+    rendered = {}
+    tasks = [(size, ICON_FONT, str(assets_dir)) for size in sizes]
+    tasks += [(size, ICON_FONT, None) for size in ICNS_SIZES if size not in sizes]
+    with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as executor:
+        for size, data, png_path in executor.map(_render_size, tasks):
+            rendered[size] = Image.open(io.BytesIO(data))
+            rendered[size].load()
+            if png_path is not None:
+                print(f"Created {png_path}")
     
     # Create ICO file for Windows
     try:
-        # Load the largest PNG for ICO conversion
-        large_img = Image.open(assets_dir / "nse_icon_256x256.png")
-        
-        # Create multi-resolution ICO
-        ico_images = []
-        for size in [16, 24, 32, 48, 64, 128, 256]:
-            ico_img = large_img.resize((size, size), Image.Resampling.LANCZOS)
-            ico_images.append(ico_img)
+        # Embed every size's own render, like the ICNS below, rather than
+        # downscaling the 256x256 one
+        ico_images = [rendered[size] for size in sizes]
         
         ico_path = assets_dir / "nse_icon.ico"
-        ico_images[0].save(ico_path, format='ICO', sizes=[(img.width, img.height) for img in ico_images])
+        save_ico(ico_images, ico_path)
         print(f"Created {ico_path}")
         
     except Exception as e:
         print(f"Could not create ICO file: {e}")
+        complete = False
+    
+    # Create a single multi-resolution ICNS for macOS/Linux packaging. Every
+    # entry Pillow writes has its own render, so none is resized from the
+    # primary image
+    try:
+        icns_path = assets_dir / "nse_icon.icns"
+        large_img = rendered[ICNS_SIZES[-1]]
+        large_img.save(icns_path, format='ICNS',
+                       append_images=[rendered[size] for size in ICNS_SIZES[:-1]])
+        print(f"Created {icns_path}")
+    except Exception as e:
+        print(f"Could not create ICNS file: {e}")
+        complete = False
     
     # Create a main icon (copy of 64x64)
     try:
-        main_icon = Image.open(assets_dir / "nse_icon_64x64.png")
-        main_icon.save(assets_dir / "nse_icon.png")
+        main_icon = rendered[64]
+        save_png(main_icon, assets_dir / "nse_icon.png")
         print(f"Created main icon: {assets_dir / 'nse_icon.png'}")
     except Exception as e:
         print(f"Could not create main icon: {e}")
+        complete = False
+    
+    if complete:
+        record_manifest(assets_dir, "icon", key, outputs)
+
+# Splash screen progress bar track color
+SPLASH_PROGRESS_TRACK = (220, 220, 220)
+
+def splash_progress_box(width, height):
+    """Outer box of the splash progress bar (left, top, right, bottom; inclusive)"""
+    progress_y = height - 40
+    return (50, progress_y, width - 50, progress_y + 10)
+
+def paint_splash_progress(img, progress=0.0):
+    """Paint the splash progress bar at progress (0.0 - 1.0)
+    
+    Only solid fills, so this is cheap enough to call for every frame of an
+    animated splash without redrawing the text.
+    """
+    left, top, right, bottom = splash_progress_box(*img.size)
+    # 1px outline around the track
+    img.paste(PRIMARY_COLOR, (left, top, right + 1, bottom + 1))
+    img.paste(SPLASH_PROGRESS_TRACK, (left + 1, top + 1, right, bottom))
+    filled = int((right - left - 1) * max(0.0, min(1.0, progress)))
+    if filled > 0:
+        img.paste(PRIMARY_COLOR, (left + 1, top + 1, left + 1 + filled, bottom))
 
 def create_splash_screen():
     """Create a professional splash screen"""
@@ -112,38 +141,49 @@ def create_splash_screen():
     
     # Create splash screen image
     width, height = 400, 300
+    
+    font_file = resolve_font_path(ICON_FONT)
+    key = inputs_key(width, height, PRIMARY_COLOR, font_file, file_mtime(font_file),
+                     file_mtime(__file__))
+    if is_up_to_date(assets_dir, "splash", key, ["splash_screen.png"]):
+        print("Splash screen is up to date")
+        return
     img = Image.new('RGB', (width, height), (245, 245, 245))  # Light gray background
-    draw = ImageDraw.Draw(img)
     
     # Professional colors
     primary_color = (0, 102, 204)
     accent_color = (255, 165, 0)
     text_color = (51, 51, 51)
     
-    # Draw header background
-    draw.rectangle([0, 0, width, 80], fill=primary_color)
+    # Flat areas are filled with paste(), a straight buffer fill, before
+    # any text is drawn
+    # Header background
+    img.paste(primary_color, (0, 0, width, 81))
+    
+    # Progress bar area
+    paint_splash_progress(img)
+    
+    draw = ImageDraw.Draw(img)
     
     # Try to load fonts
     try:
         title_font = ImageFont.truetype("arial.ttf", 24)
-        subtitle_font = ImageFont.truetype("arial.ttf", 14)
-        version_font = ImageFont.truetype("arial.ttf", 12)
+        subtitle_font = title_font.font_variant(size=14)
+        version_font = title_font.font_variant(size=12)
     except:
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-        version_font = ImageFont.load_default()
+        title_font = fallback_font(24)
+        subtitle_font = fallback_font(14)
+        version_font = fallback_font(12)
     
     # Draw title
     title = "NSE DataSync Pro"
-    title_bbox = draw.textbbox((0, 0), title, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
+    title_width = int(title_font.getlength(title))
     
     draw.text(((width - title_width) // 2, 20), title, fill=(255, 255, 255), font=title_font)
     
     # Draw subtitle
     subtitle = "Professional Edition v2.0"
-    subtitle_bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
-    subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
+    subtitle_width = int(subtitle_font.getlength(subtitle))
     
     draw.text(((width - subtitle_width) // 2, 50), subtitle, fill=(255, 255, 255), font=subtitle_font)
     
@@ -171,20 +211,15 @@ def create_splash_screen():
         elif line == "":
             pass  # Skip empty lines
         else:
-            line_bbox = draw.textbbox((0, 0), line, font=version_font)
-            line_width = line_bbox[2] - line_bbox[0]
+            line_width = int(version_font.getlength(line))
             draw.text(((width - line_width) // 2, y_pos), line, fill=text_color, font=version_font)
         
         y_pos += 18
     
-    # Draw progress bar area
-    progress_y = height - 40
-    draw.rectangle([50, progress_y, width - 50, progress_y + 10], 
-                  fill=(220, 220, 220), outline=primary_color)
-    
     # Save splash screen
     splash_path = assets_dir / "splash_screen.png"
-    img.save(splash_path, 'PNG')
+    save_png(img, splash_path)
+    record_manifest(assets_dir, "splash", key, ["splash_screen.png"])
     print(f"Created splash screen: {splash_path}")
 
 if __name__ == "__main__":
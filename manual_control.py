@@ -7,10 +7,15 @@ Version: 2.0 Professional Edition
 """
 
 import os
+import re
+import base64
+import getpass
+import select
 import sys
 import sqlite3
 import time
 import argparse
+import atexit
 import subprocess
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -19,10 +24,125 @@ from datetime import datetime, timedelta
 try:
     import psutil
     HAS_PSUTIL = True
+    # psutil 6.0+ no longer re-checks every PID for reuse during process_iter
+    PSUTIL_FAST_ITER = tuple(int(part) for part in psutil.__version__.split('.')[:2]) >= (6, 0)
 except ImportError:
     HAS_PSUTIL = False
+    PSUTIL_FAST_ITER = False
     print("Warning: psutil not installed. Some features may be limited.")
 
+# How long a process table snapshot is reused across commands (seconds)
+PROCESS_CACHE_TTL = 1.0
+
+# Fields read for every scanned process (shared, not rebuilt per scan)
+PROCESS_ATTRS = ('pid', 'name', 'cmdline', 'create_time')
+
+# Applied once when the shared database connection is opened
+DB_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=134217728;
+'''
+
+# Range scans on start_time that also group by segment (show_statistics);
+# created with the schema, never from a read-only command
+RUN_HISTORY_TIME_SEGMENT_INDEX = (
+    'CREATE INDEX IF NOT EXISTS idx_run_hist_time_seg ON run_history(start_time, segment)'
+)
+
+# Query text kept identical between calls so the connection's prepared
+# statement cache hits instead of re-parsing and re-planning
+SQL_SETTINGS = 'SELECT key, value FROM settings'
+SQL_LAST_RUN = '''
+    SELECT
+        (SELECT start_time FROM run_history ORDER BY start_time DESC LIMIT 1),
+        (SELECT status FROM run_history ORDER BY start_time DESC LIMIT 1)
+'''
+SQL_GET_CREDENTIALS = (
+    'SELECT member_code, login_id, encrypted_password, secret_key '
+    'FROM credentials WHERE id = 1 AND is_active = 1'
+)
+SQL_RUN_TOTALS = '''
+    SELECT 
+        COUNT(*) as total_runs,
+        SUM(files_downloaded) as total_files,
+        SUM(total_size_mb) as total_size,
+        COUNT(CASE WHEN status = 'success' THEN 1 END) as successful_runs
+    FROM run_history 
+    WHERE start_time >= ?
+'''
+SQL_SEGMENT_TOTALS = '''
+    SELECT segment, COUNT(*), SUM(files_downloaded), SUM(total_size_mb)
+    FROM run_history
+    WHERE start_time >= ? AND segment IS NOT NULL
+    GROUP BY segment
+'''
+
+# On POSIX, CPython launches children with posix_spawn() instead of fork+exec
+# only when close_fds is False (and no preexec_fn/cwd/new session is used).
+# Python-created descriptors are non-inheritable (PEP 446), so nothing leaks.
+SPAWN_KWARGS = {} if sys.platform == "win32" else {'close_fds': False}
+
+# Start/stop confirmation timeouts (seconds)
+START_TIMEOUT = 3.0
+STOP_TIMEOUT = 5.0
+
+# Command-line substrings identifying our processes. Generic interpreter
+# names (python.exe) would match every Python process, so none are listed.
+PROCESS_NAMES = (
+    "nse_datasync_gui.py",  # Fixed: was nse_datasync_pro_gui.py
+    "nse_backup_bot.py",    # Fixed: was nse_enhanced_backup_bot.py
+    "nse_scheduler.py",
+)
+APP_SCRIPTS = PROCESS_NAMES[:2]  # GUI and bot: what start/stop manage
+STATUS_NEEDLES = ('nse_datasync', 'NSE', 'nse_backup_bot')
+
+
+def _compile_needles(needles):
+    """One alternation regex per needle set: a single search per command line"""
+    return re.compile('|'.join(map(re.escape, needles)))
+
+
+_APP_CMD_RE = _compile_needles(APP_SCRIPTS)
+_STATUS_CMD_RE = _compile_needles(STATUS_NEEDLES)
+# Emergency stop (and the broadest snapshot filter): any of our scripts in
+# any case. A bare "NSE" needle also hit unrelated names such as "SUSPENSE"
+_NSE_CMD_RE = re.compile(r'nse_(?:datasync|backup_bot|scheduler)', re.IGNORECASE)
+
+
+def _matches_nse(cmdline, pattern=_NSE_CMD_RE):
+    """Check command line arguments against a compiled needle set
+    
+    Searches each argument in turn rather than a joined string: no
+    allocation, and it stops at the first hit (usually the script name).
+    """
+    return any(pattern.search(arg) for arg in cmdline)
+
+
+_bot_cls = None
+
+
+def _bot_class():
+    """Import NSEMemberBackupBot on first use; the bot module is optional here"""
+    global _bot_cls
+    if _bot_cls is None:
+        from nse_backup_bot import NSEMemberBackupBot
+        _bot_cls = NSEMemberBackupBot
+    return _bot_cls
+
+
+_devnull_fd = None
+
+
+def _devnull():
+    """One /dev/null descriptor for all background launches, opened on first use"""
+    global _devnull_fd
+    if _devnull_fd is None:
+        _devnull_fd = os.open(os.devnull, os.O_RDWR)
+        atexit.register(os.close, _devnull_fd)
+    return _devnull_fd
+
 
 class NSEManualController:
     """Manual control interface for NSE DataSync Pro"""
@@ -30,12 +150,83 @@ class NSEManualController:
     def __init__(self):
         self.db_path = Path("nse_datasync_pro.db")
         self.app_script = "nse_datasync_gui.py"  # Fixed: was nse_datasync_pro_gui.py
-        self.process_names = [
-            "nse_datasync_gui.py",  # Fixed: was nse_datasync_pro_gui.py
-            "nse_backup_bot.py",    # Fixed: was nse_enhanced_backup_bot.py
-            "nse_scheduler.py",
-            "python.exe"  # For Windows processes
-        ]
+        self.process_names = PROCESS_NAMES
+        self._proc_cache = None  # (monotonic timestamp, [(psutil.Process, cmdline)])
+        self._conn = None
+        self._settings_cache = None
+        self._known_pids = {}  # pid -> psutil.Process of our running app
+
+    def _db(self):
+        """Shared database connection, opened and tuned on first use"""
+        if self._conn is None:
+            # Autocommit mode: each statement commits on its own
+            self._conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+            self._conn.executescript(DB_PRAGMAS)
+            atexit.register(self._close_db)
+        return self._conn
+
+    def _settings(self):
+        """All settings as a dict, read with one query on first use"""
+        if self._settings_cache is None:
+            self._settings_cache = dict(self._db().execute(SQL_SETTINGS))
+        return self._settings_cache
+
+    def _close_db(self):
+        """Let SQLite refresh planner statistics, then close the shared connection"""
+        if self._conn is not None:
+            try:
+                self._conn.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+            self._conn = None
+
+    def _iter_nse_procs(self):
+        """Return (process, cmdline) pairs from a single, briefly cached scan"""
+        now = time.monotonic()
+        if self._proc_cache is not None and now - self._proc_cache[0] < PROCESS_CACHE_TTL:
+            return self._proc_cache[1]
+        
+        procs = []
+        for proc in self._scan_processes():
+            try:
+                # Broadest match set here, callers narrow it down further
+                cmdline = proc.info['cmdline'] or ()
+                if _matches_nse(cmdline):
+                    procs.append((proc, cmdline))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        
+        self._proc_cache = (now, procs)
+        return procs
+
+    def _scan_processes(self):
+        """Yield processes with a populated ``info`` dict"""
+        if PSUTIL_FAST_ITER:
+            yield from psutil.process_iter(PROCESS_ATTRS)
+            return
+        
+        # Older psutil: read only the cmdline up front and fetch the remaining
+        # fields for matching processes, skipping process_iter's reuse check
+        for pid in psutil.pids():
+            try:
+                proc = psutil.Process(pid)
+                cmdline = proc.cmdline()
+                if not _matches_nse(cmdline):
+                    continue
+                proc.info = {
+                    'pid': pid,
+                    'name': proc.name(),
+                    'cmdline': cmdline,
+                    'create_time': proc.create_time(),
+                }
+                yield proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+    def cache_clear(self):
+        """Invalidate the process snapshot, e.g. after terminating processes"""
+        self._proc_cache = None
 
     def start_application(self, background=False):
         """Start the NSE DataSync Pro application"""
@@ -49,20 +240,20 @@ class NSEManualController:
             if background:
                 # Start in background mode
                 if sys.platform == "win32":
-                    subprocess.Popen([
+                    process = subprocess.Popen([
                         sys.executable, self.app_script
                     ], creationflags=subprocess.CREATE_NO_WINDOW)
                 else:
-                    subprocess.Popen([
+                    devnull = _devnull()
+                    process = subprocess.Popen([
                         sys.executable, self.app_script
-                    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    ], stdout=devnull, stderr=devnull, **SPAWN_KWARGS)
             else:
                 # Start normally
-                subprocess.Popen([sys.executable, self.app_script])
+                process = subprocess.Popen([sys.executable, self.app_script], **SPAWN_KWARGS)
             
-            # Wait a moment and check if it started
-            time.sleep(3)
-            if self.is_running():
+            # Wait until it shows up (or dies) and check if it started
+            if self._wait_started(process):
                 print("✅ Application started successfully")
                 return True
             else:
@@ -73,6 +264,51 @@ class NSEManualController:
             print(f"❌ Error starting application: {e}")
             return False
 
+    def _wait_started(self, process, timeout=START_TIMEOUT):
+        """Wait until the launched application is visible or its process exits
+        
+        Polls with exponential backoff; on Linux the child's exit is observed
+        through a pidfd so a crash ends the wait immediately.
+        """
+        if not HAS_PSUTIL:
+            # Nothing to poll; give it the full startup window
+            time.sleep(timeout)
+            return self.is_running()
+        
+        pidfd = None
+        if hasattr(os, 'pidfd_open') and hasattr(select, 'poll'):
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                pidfd = None
+        
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        try:
+            while True:
+                self.cache_clear()
+                if self.is_running():
+                    return True
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(delay, remaining)
+                delay = min(delay * 2, 0.5)
+                
+                if pidfd is not None:
+                    poller = select.poll()
+                    poller.register(pidfd, select.POLLIN)
+                    if poller.poll(wait * 1000):
+                        return False  # Child exited during startup
+                else:
+                    if process.poll() is not None:
+                        return False
+                    time.sleep(wait)
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+
     def stop_application(self):
         """Stop the NSE DataSync Pro application gracefully"""
         if not HAS_PSUTIL:
@@ -82,22 +318,27 @@ class NSEManualController:
             
         print("🛑 Stopping NSE DataSync Pro...")
         
-        stopped_processes = 0
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        terminated = []
+        for proc, cmdline in self._iter_nse_procs():
             try:
                 # Check if it's our application process
-                if proc.info['cmdline'] and any(
-                    script in ' '.join(proc.info['cmdline']) 
-                    for script in ['nse_datasync_gui.py', 'nse_backup_bot.py']  # Fixed module names
-                ):
+                if _matches_nse(cmdline, _APP_CMD_RE):
                     print(f"Stopping process {proc.info['pid']}: {proc.info['name']}")
                     proc.terminate()
-                    stopped_processes += 1
+                    terminated.append(proc)
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
         
-        if stopped_processes > 0:
-            print(f"✅ Stopped {stopped_processes} process(es)")
+        # Signal everything first, then wait for all of them together
+        gone, alive = psutil.wait_procs(terminated, timeout=STOP_TIMEOUT)
+        self.cache_clear()
+        
+        if alive:
+            print(f"⚠️ {len(alive)} process(es) still running after {STOP_TIMEOUT:.0f}s: "
+                  f"{', '.join(str(proc.pid) for proc in alive)}")
+        
+        if terminated:
+            print(f"✅ Stopped {len(gone)} process(es)")
         else:
             print("🟡 No running processes found")
         
@@ -113,17 +354,15 @@ class NSEManualController:
         print("🚨 Emergency Stop - Terminating all NSE processes...")
         
         killed_processes = 0
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        for proc, cmdline in self._iter_nse_procs():
             try:
-                if proc.info['cmdline'] and any(
-                    script in ' '.join(proc.info['cmdline'])
-                    for script in ['nse_datasync', 'NSE', 'nse_backup_bot', 'nse_scheduler']  # Fixed module names
-                ):
+                if _matches_nse(cmdline, _NSE_CMD_RE):
                     print(f"Force killing PID {proc.info['pid']}: {proc.info['name']}")
                     proc.kill()
                     killed_processes += 1
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
+        self.cache_clear()
         
         print(f"✅ Emergency stop completed - {killed_processes} process(es) terminated")
         return True
@@ -138,12 +377,17 @@ class NSEManualController:
                 print("Install psutil for better process monitoring: pip install psutil")
             return False
             
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        # Polling callers: re-check processes found earlier before paying for
+        # a full scan. Process.is_running() also guards against PID reuse
+        for pid, proc in list(self._known_pids.items()):
+            if proc.is_running():
+                return True
+            del self._known_pids[pid]
+        
+        for proc, cmdline in self._iter_nse_procs():
             try:
-                if proc.info['cmdline'] and any(
-                    script in ' '.join(proc.info['cmdline'])
-                    for script in ['nse_datasync_gui.py', 'nse_backup_bot.py']  # Fixed module names
-                ):
+                if _matches_nse(cmdline, _APP_CMD_RE):
+                    self._known_pids[proc.pid] = proc
                     return True
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
@@ -151,86 +395,78 @@ class NSEManualController:
 
     def status(self):
         """Show detailed application status"""
-        print("📊 NSE DataSync Pro - System Status")
-        print("=" * 50)
+        # Collected and written once: one stdout write instead of one per line
+        out = []
+        out.append("📊 NSE DataSync Pro - System Status")
+        out.append("=" * 50)
         
         if not HAS_PSUTIL:
-            print("⚠️ psutil not available - limited status information")
-            print("Install psutil for full monitoring: pip install psutil")
-            print()
+            out.append("⚠️ psutil not available - limited status information")
+            out.append("Install psutil for full monitoring: pip install psutil")
+            out.append("")
         
         # Check running processes and build the missing process info
         running_processes = []
         if HAS_PSUTIL:
-            for proc in psutil.process_iter(['pid', 'name', 'create_time', 'cmdline']):
+            now = datetime.now()
+            for proc, cmdline in self._iter_nse_procs():
                 try:
                     # Check if it's related to our application
-                    if proc.info['cmdline'] and any(
-                        script in ' '.join(proc.info['cmdline'])
-                        for script in ['nse_datasync', 'NSE', 'nse_backup_bot']  # Fixed module names
-                    ):
+                    if _matches_nse(cmdline, _STATUS_CMD_RE):
                         start_time = datetime.fromtimestamp(proc.info['create_time'])
                         running_processes.append({
                             'pid': proc.info['pid'],
                             'name': proc.info['name'],
                             'start_time': start_time,
-                            'uptime': datetime.now() - start_time
+                            'uptime': now - start_time
                         })
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
         
         if running_processes:
-            print("🟢 Status: RUNNING")
-            print(f"Active Processes: {len(running_processes)}")
+            out.append("🟢 Status: RUNNING")
+            out.append(f"Active Processes: {len(running_processes)}")
             for proc in running_processes:
-                print(f"  PID {proc['pid']}: {proc['name']} (uptime: {proc['uptime']})")
+                out.append(f"  PID {proc['pid']}: {proc['name']} (uptime: {proc['uptime']})")
         else:
-            print("🔴 Status: STOPPED")
-            print("No active processes found")
+            out.append("🔴 Status: STOPPED")
+            out.append("No active processes found")
         
-        print()
+        out.append("")
         
         # Check database status
         if self.db_path.exists():
             try:
-                with sqlite3.connect(str(self.db_path)) as conn:
+                with self._db() as conn:
                     cursor = conn.cursor()
                     
-                    # Get last activity
-                    cursor.execute('''
-                        SELECT start_time, status FROM run_history 
-                        ORDER BY start_time DESC LIMIT 1
-                    ''')
-                    last_run = cursor.fetchone()
+                    # Last activity in a single round-trip
+                    cursor.execute(SQL_LAST_RUN)
+                    last_start, last_status = cursor.fetchone()
+                    settings = self._settings()
                     
-                    if last_run:
-                        last_time = datetime.fromisoformat(last_run[0])
-                        print(f"Last Activity: {last_time.strftime('%Y-%m-%d %H:%M:%S')} ({last_run[1]})")
+                    if last_start:
+                        last_time = datetime.fromisoformat(last_start)
+                        out.append(f"Last Activity: {last_time.strftime('%Y-%m-%d %H:%M:%S')} ({last_status})")
                     else:
-                        print("Last Activity: Never")
+                        out.append("Last Activity: Never")
                     
                     # Get scheduler status
-                    cursor.execute('''
-                        SELECT value FROM settings WHERE key = 'interval_minutes'
-                    ''')
-                    interval_result = cursor.fetchone()
-                    interval = interval_result[0] if interval_result else "Not set"
+                    interval = settings.get('interval_minutes', "Not set")
                     
-                    print(f"Scheduler Interval: {interval} minutes")
+                    out.append(f"Scheduler Interval: {interval} minutes")
                     
                     # Get download directory
-                    cursor.execute('''
-                        SELECT value FROM settings WHERE key = 'download_path'
-                    ''')
-                    path_result = cursor.fetchone()
-                    download_path = path_result[0] if path_result else "Not set"
+                    download_path = settings.get('download_path', "Not set")
                     
-                    print(f"Download Directory: {download_path}")
+                    out.append(f"Download Directory: {download_path}")
                     
             except Exception as e:
-                print(f"Database Error: {e}")
+                out.append(f"Database Error: {e}")
         else:
-            print("Database: Not found (first run)")
+            out.append("Database: Not found (first run)")
+        
+        sys.stdout.write('\n'.join(out) + '\n')
     
     def run_manual_download(self, segments=None):
         """Run a manual download"""
@@ -243,7 +479,7 @@ class NSEManualController:
         
         try:
             # Import and run the backup bot - Fixed module name
-            from nse_backup_bot import NSEMemberBackupBot
+            NSEMemberBackupBot = _bot_class()
             
             # Get credentials from database or environment
             credentials = self.get_credentials()
@@ -304,16 +540,12 @@ class NSEManualController:
             if not self.db_path.exists():
                 return None
                 
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self._db() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT member_code, login_id, encrypted_password, secret_key 
-                    FROM credentials WHERE id = 1 AND is_active = 1
-                ''')
+                cursor.execute(SQL_GET_CREDENTIALS)
                 result = cursor.fetchone()
                 
                 if result:
-                    import base64
                     decrypted_password = base64.b64decode(result[2].encode()).decode()
                     return {
                         'member_code': result[0],
@@ -331,15 +563,9 @@ class NSEManualController:
             if not self.db_path.exists():
                 return str(Path.home() / 'Downloads' / 'NSE_DataSync_Pro')
                 
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT value FROM settings WHERE key = 'download_path'
-                ''')
-                result = cursor.fetchone()
-                
-                if result:
-                    return result[0]
+            download_path = self._settings().get('download_path')
+            if download_path:
+                return download_path
         except Exception:
             pass
         
@@ -356,53 +582,64 @@ class NSEManualController:
             return
         
         # Find the most recent log file
-        log_files = sorted(log_dir.glob("*.log"), 
-                          key=lambda x: x.stat().st_mtime, reverse=True)
+        latest_log = self._find_latest_log(log_dir)
         
-        if not log_files:
+        if latest_log is None:
             print("No log files found")
             return
         
-        latest_log = log_files[0]
         print(f"Log file: {latest_log}")
         print("-" * 60)
         
         try:
-            with open(latest_log, 'r', encoding='utf-8') as f:
-                all_lines = f.readlines()
-                recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-                
-                for line in recent_lines:
-                    print(line.rstrip())
+            recent_lines = self._tail_lines(latest_log, lines)
+            if recent_lines:
+                sys.stdout.write('\n'.join(line.rstrip() for line in recent_lines) + '\n')
                     
         except Exception as e:
             print(f"Error reading log file: {e}")
     
+    def _find_latest_log(self, log_dir):
+        """Most recently modified *.log in log_dir, or None"""
+        return max(log_dir.glob("*.log"), key=lambda p: p.stat().st_mtime, default=None)
+    
+    @staticmethod
+    def _tail_lines(path, lines, block_size=65536):
+        """Return the last `lines` lines of a file, reading blocks backwards from the end"""
+        if lines <= 0:
+            return []
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            # One extra newline guarantees the first kept line is complete
+            while position > 0 and data.count(b'\n') <= lines:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+        return data.decode('utf-8', 'replace').splitlines()[-lines:]
+    
     def show_statistics(self, days=30):
         """Show download statistics"""
-        print(f"📊 Download Statistics (last {days} days)")
-        print("=" * 50)
+        out = []
+        out.append(f"📊 Download Statistics (last {days} days)")
+        out.append("=" * 50)
         
         try:
             if not self.db_path.exists():
-                print("No database found")
+                out.append("No database found")
                 return
                 
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self._db() as conn:
                 cursor = conn.cursor()
                 
-                cutoff_date = datetime.now() - timedelta(days=days)
+                # Bound as text in the same format sqlite3's datetime adapter
+                # stores, so no adapter runs and string comparison stays exact
+                cutoff_date = (datetime.now() - timedelta(days=days)).isoformat(sep=' ')
                 
                 # Overall statistics
-                cursor.execute('''
-                    SELECT 
-                        COUNT(*) as total_runs,
-                        SUM(files_downloaded) as total_files,
-                        SUM(total_size_mb) as total_size,
-                        COUNT(CASE WHEN status = 'success' THEN 1 END) as successful_runs
-                    FROM run_history 
-                    WHERE start_time >= ?
-                ''', (cutoff_date,))
+                cursor.execute(SQL_RUN_TOTALS, (cutoff_date,))
                 
                 stats = cursor.fetchone()
                 
@@ -410,32 +647,29 @@ class NSEManualController:
                     total_runs, total_files, total_size, successful_runs = stats
                     success_rate = (successful_runs / total_runs) * 100 if total_runs > 0 else 0
                     
-                    print(f"Total Runs: {total_runs}")
-                    print(f"Successful Runs: {successful_runs}")
-                    print(f"Success Rate: {success_rate:.1f}%")
-                    print(f"Total Files Downloaded: {total_files or 0}")
-                    print(f"Total Size: {total_size or 0:.2f} MB")
+                    out.append(f"Total Runs: {total_runs}")
+                    out.append(f"Successful Runs: {successful_runs}")
+                    out.append(f"Success Rate: {success_rate:.1f}%")
+                    out.append(f"Total Files Downloaded: {total_files or 0}")
+                    out.append(f"Total Size: {total_size or 0:.2f} MB")
                     
                     # Per-segment breakdown
-                    cursor.execute('''
-                        SELECT segment, COUNT(*), SUM(files_downloaded), SUM(total_size_mb)
-                        FROM run_history 
-                        WHERE start_time >= ? AND segment IS NOT NULL
-                        GROUP BY segment
-                    ''', (cutoff_date,))
+                    cursor.execute(SQL_SEGMENT_TOTALS, (cutoff_date,))
                     
                     segment_stats = cursor.fetchall()
                     
                     if segment_stats:
-                        print("\nPer-Segment Breakdown:")
+                        out.append("\nPer-Segment Breakdown:")
                         for segment, runs, files, size in segment_stats:
-                            print(f"  {segment}: {runs} runs, {files or 0} files, {size or 0:.2f} MB")
+                            out.append(f"  {segment}: {runs} runs, {files or 0} files, {size or 0:.2f} MB")
                     
                 else:
-                    print("No data available for the specified period")
+                    out.append("No data available for the specified period")
                     
         except Exception as e:
-            print(f"Error retrieving statistics: {e}")
+            out.append(f"Error retrieving statistics: {e}")
+        finally:
+            sys.stdout.write('\n'.join(out) + '\n')
     
     def configure_credentials(self):
         """Interactive credential configuration"""
@@ -443,8 +677,6 @@ class NSEManualController:
         print("=" * 40)
         
         try:
-            import getpass
-            
             member_code = input("Member Code: ").strip()
             login_id = input("Login ID: ").strip()
             password = getpass.getpass("Password: ").strip()
@@ -455,7 +687,6 @@ class NSEManualController:
                 return False
             
             # Encrypt and save credentials
-            import base64
             encrypted_password = base64.b64encode(password.encode()).decode()
             
             # Ensure database exists
@@ -471,7 +702,7 @@ class NSEManualController:
                     self._create_basic_db_schema()
             
             # Save credentials
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self._db() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT OR REPLACE INTO credentials 
@@ -500,7 +731,7 @@ class NSEManualController:
     def _create_basic_db_schema(self):
         """Create basic database schema if GUI module is not available"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self._db() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS credentials (
@@ -533,6 +764,8 @@ class NSEManualController:
                         error_message TEXT
                     )
                 ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_history_start ON run_history(start_time DESC)')
+                cursor.execute(RUN_HISTORY_TIME_SEGMENT_INDEX)
                 conn.commit()
         except Exception as e:
             print(f"Error creating database schema: {e}")
@@ -548,7 +781,7 @@ class NSEManualController:
                 return False
             
             # Fixed module name
-            from nse_backup_bot import NSEMemberBackupBot
+            NSEMemberBackupBot = _bot_class()
             
             bot = NSEMemberBackupBot(
                 member_code=credentials['member_code'],
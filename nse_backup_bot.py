@@ -7,10 +7,12 @@ Version: 2.0 Professional Edition
 """
 
 import os
+import re
 import sys
 import json
 import time
 import gzip
+import io
 import sqlite3
 import logging
 import requests
@@ -18,10 +20,12 @@ import base64
 import platform
 import hashlib
 import shutil
+import threading
 import urllib3  # Add direct import of urllib3
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
@@ -29,6 +33,22 @@ from urllib3.exceptions import InsecureRequestWarning
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+# Optional import with graceful fallback: faster decoding of API responses
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional import with graceful fallback: ISA-L's inflate (python-isal) is a
+# drop-in for gzip.GzipFile and decompresses downloads 2-3x faster
+try:
+    from isal import igzip
+    HAS_ISAL = True
+except ImportError:
+    igzip = gzip
+    HAS_ISAL = False
+
 # Suppress SSL warnings - Fix the urllib3 attribute access issue
 urllib3.disable_warnings(InsecureRequestWarning)
 
@@ -39,16 +59,129 @@ sqlite3.register_adapter(date, lambda val: val.isoformat())
 sqlite3.register_converter("TIMESTAMP", lambda val: datetime.fromisoformat(val.decode()))
 sqlite3.register_converter("DATE", lambda val: datetime.fromisoformat(val.decode()).date())
 
+# Download records are buffered and written in one transaction per batch;
+# a commit (and its fsync) per file dominated the tracking phase
+RECORD_BATCH_SIZE = 50
+
+# Kept as one constant so every flush hits the connection's statement cache
+SQL_INSERT_DOWNLOAD = '''
+    INSERT INTO bot_file_downloads
+    (file_id, file_name, segment, download_date, file_path, file_size, checksum)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Dates embedded in NSE file names
+_TRADE_DATE_RE = re.compile(r'Trade_NSE_\w+_\d+_TM_\d+_(\d{8})_')  # ..._YYYYMMDD_...
+_ORDLOG_DATE_RE = re.compile(r'_ORD_LOG_(\d{8})_')                 # ..._ORD_LOG_DDMMYYYY_...
+_GENERIC_DATE_RE = re.compile(r'(\d{8})')
+
+# Start offset of a 206 body: Content-Range: bytes <start>-<end>/<total or *>
+_CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-\d+/(?:\d+|\*)')
+
+# Segments probed by check_segment_access
+ACCESS_SEGMENTS = ('CM', 'FO', 'CD', 'CO', 'SLB')
+
+# Candidate folder paths listed at once while looking for a segment's files
+PATH_PROBE_BATCH = 2
+
+# Applied once when the tracking database connection is opened
+DB_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+'''
+
+# Block size for writing downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Download blocks adapt to measured bandwidth: about CHUNK_TARGET_SECONDS of
+# transfer per block, within these bounds (EWMA weight kept on the old estimate)
+CHUNK_SIZE_MIN = 64 << 10
+CHUNK_SIZE_MAX = 4 << 20
+CHUNK_TARGET_SECONDS = 0.05
+BANDWIDTH_EWMA_ALPHA = 0.9
+
+# First two bytes of every gzip stream
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Concurrent file downloads per segment, and each worker's pause between files
+DOWNLOAD_WORKERS = 6
+DOWNLOAD_DELAY = 0.5
+
+# Longest single retry backoff (seconds)
+RETRY_BACKOFF_MAX = 20
+
+# HTTP connection pool: hosts kept and connections per host
+HTTP_POOL_CONNECTIONS = 8
+HTTP_POOL_MAXSIZE = 32
+
+def _parse_json(response: requests.Response):
+    """Decode a JSON response body, with orjson when it is installed"""
+    if HAS_ORJSON:
+        return orjson.loads(response.content)
+    return response.json()
+
+def _range_start(content_range: Optional[str]) -> Optional[int]:
+    """First byte offset named by a Content-Range header, or None if unparseable"""
+    match = _CONTENT_RANGE_RE.match(content_range or '')
+    return int(match.group(1)) if match else None
+
+def _resume_validator(headers) -> Optional[str]:
+    """Strong ETag, else Last-Modified: the value If-Range can check a resume against"""
+    etag = headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return headers.get('Last-Modified')
+
+def _copy_and_hash(src, dst, sha256_hash=None, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
+    """Copy src to dst in chunk_size blocks, returning the SHA-256 of what was written
+
+    Pass sha256_hash to carry on a digest already fed with earlier content.
+    """
+    if sha256_hash is None:
+        sha256_hash = hashlib.sha256()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    while True:
+        n = src.readinto(buf)
+        if not n:
+            break
+        sha256_hash.update(view[:n])
+        dst.write(view[:n])
+    return sha256_hash.hexdigest()
+
+def _drop_page_cache(f):
+    """Write a finished file back and drop it from the page cache (no-op where unsupported)
+    
+    DONTNEED skips dirty pages, so the data is fsync'ed first; that also makes
+    the os.replace() that follows crash-safe.
+    """
+    if hasattr(os, 'posix_fadvise'):
+        f.flush()
+        try:
+            os.fsync(f.fileno())
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
 class NSEMemberBackupBot:
     """Enhanced NSE Member Backup Bot with professional file organization"""
     
     def __init__(self, member_code: str, login_id: str, password: str, 
-                 secret_key: str, download_dir: Optional[str] = None):
+                 secret_key: str, download_dir: Optional[str] = None,
+                 parallelism: int = DOWNLOAD_WORKERS, verbose: bool = True):
         """Initialize the NSE backup bot"""
         self.member_code = member_code
         self.login_id = login_id
         self.password = password
         self.secret_key = secret_key
+        self._cipher = None  # AES cipher for secret_key, built on first use
+        self._segment_access: Dict[str, bool] = {}  # Filled in as segments are listed
+        self.parallelism = max(1, parallelism)  # Should stay <= HTTP_POOL_MAXSIZE
+        self.verbose = verbose  # Print a line per file, not just segment summaries
+        self._bw_ewma = 0.0  # Per-connection download rate (bytes/s), see _chunk_size
         
         # Set up download directory with professional structure
         if download_dir:
@@ -57,12 +190,12 @@ class NSEMemberBackupBot:
             self.base_download_dir = Path.home() / 'Downloads' / 'NSE_DataSync_Pro'
         
         self.base_download_dir.mkdir(parents=True, exist_ok=True)
+        self._dir_cache: Dict[Tuple[str, str, str, str], Path] = {}  # date dirs already created
         
         # Initialize session and logging
         self.session_token = None
-        self.session: Optional[requests.Session] = None  # Use Optional in type hint
+        self._session: Optional[requests.Session] = None  # Built on first use, see session
         self.setup_logging()
-        self.setup_session()
         
         # API endpoints
         self.base_url = "https://www.connect2nse.com/extranet-api"
@@ -102,79 +235,139 @@ class NSEMemberBackupBot:
             console_handler.setFormatter(formatter)
             self.logger.addHandler(console_handler)
     
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session, set up on first use"""
+        if self._session is None:
+            self.setup_session()
+        return self._session
+    
     def setup_session(self):
         """Setup HTTP session with retry strategy"""
         # Initialize a new session
-        self.session = requests.Session()
+        self._session = requests.Session()
         
         # Configure session
-        self.session.verify = False
+        self._session.verify = False
         
-        # Enhanced retry strategy (like working version)
-        retry_strategy = Retry(
+        # Enhanced retry strategy (like working version). Server Retry-After
+        # hints are honoured, and the backoff is capped so a burst of 429/503
+        # doesn't grow into minutes of sleeping
+        retry_kwargs = dict(
             total=5,  # Increased retries
-            backoff_factor=2,  # Exponential backoff
-            status_forcelist=[429, 500, 502, 503, 504, 408],  # Added 408
+            backoff_factor=1,  # Exponential backoff
+            status_forcelist=(429, 500, 502, 503, 504, 408),  # Added 408
             read=3,  # Retry on read timeouts
+            allowed_methods=frozenset({'GET', 'POST'}),
+            respect_retry_after_header=True,
         )
+        try:
+            retry_strategy = Retry(backoff_max=RETRY_BACKOFF_MAX, **retry_kwargs)
+        except TypeError:
+            # urllib3 < 2.0 has no backoff_max; its fixed 120s cap applies
+            retry_strategy = Retry(**retry_kwargs)
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # One pooled adapter: keep-alive connections (and their TLS sessions)
+        # are reused across the many small listing calls
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS,
+                              pool_maxsize=HTTP_POOL_MAXSIZE,
+                              max_retries=retry_strategy)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         
         # Headers
-        self.session.headers.update({
+        self._session.headers.update({
             'User-Agent': 'NSE DataSync Pro/2.0',
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         })
+        
+        # Requests rely on the session's Authorization header, so restore it
+        # when the session is rebuilt after login
+        if self.session_token:
+            self._session.headers['Authorization'] = f'Bearer {self.session_token}'
     
     def setup_database(self):
         """Setup database for download tracking - now uses consolidated database"""
         # Use the main consolidated database instead of separate file
         self.db_path = Path("nse_datasync_pro.db")
         
+        # One connection is kept for the bot's lifetime, in autocommit mode;
+        # batched writes run in explicit transactions (see flush_downloads)
+        self._db_conn = sqlite3.connect(str(self.db_path), isolation_level=None,
+                                        check_same_thread=False)
+        self._db_conn.executescript(DB_PRAGMAS)
+        self._pending_downloads = []
+        self._db_lock = threading.RLock()  # Download workers share the connection and buffers
+        self._downloaded_ids: Dict[str, set] = {}  # segment -> file_ids already recorded
+        
         # The consolidated database manager already creates the bot_file_downloads table
         # So we just need to verify connection and table exists
-        with sqlite3.connect(str(self.db_path)) as conn:
-            cursor = conn.cursor()
-            
-            # Verify the table exists (created by EnhancedDatabaseManager)
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='bot_file_downloads'
-            """)
+        cursor = self._db_conn.cursor()
+        
+        # Verify the table exists (created by EnhancedDatabaseManager)
+        cursor.execute("""
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name='bot_file_downloads'
+        """)
+        
+        if not cursor.fetchone():
+            # Fallback: create table if it doesn't exist (should not happen normally)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS bot_file_downloads (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_id TEXT,
+                    file_name TEXT,
+                    segment TEXT,
+                    download_date DATE,
+                    file_path TEXT,
+                    file_size INTEGER,
+                    checksum TEXT,
+                    status TEXT DEFAULT 'completed',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
             
-            if not cursor.fetchone():
-                # Fallback: create table if it doesn't exist (should not happen normally)
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS bot_file_downloads (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        file_id TEXT,
-                        file_name TEXT,
-                        segment TEXT,
-                        download_date DATE,
-                        file_path TEXT,
-                        file_size INTEGER,
-                        checksum TEXT,
-                        status TEXT DEFAULT 'completed',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_file_id ON bot_file_downloads(file_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_segment_date ON bot_file_downloads(segment, download_date)')
-                conn.commit()
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_file_id ON bot_file_downloads(file_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_segment_date ON bot_file_downloads(segment, download_date)')
+        
+        # Covers the per-segment file_id lookups; databases created before it
+        # existed get it here too
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_seg_fid ON bot_file_downloads(segment, file_id)')
+        
+        # Folder path where each segment's files were last found, so later runs
+        # list that path first instead of probing every candidate
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS segment_paths (
+                segment TEXT PRIMARY KEY,
+                folder_path TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self._path_cache: Dict[str, str] = dict(
+            cursor.execute('SELECT segment, folder_path FROM segment_paths'))
+    
+    def close(self):
+        """Write any buffered download records and close the database connection"""
+        if self._db_conn is not None:
+            self.flush_downloads()
+            try:
+                # Re-analyzes tables whose statistics went stale after the inserts
+                self._db_conn.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                pass
+            self._db_conn.close()
+            self._db_conn = None
     
     def encrypt_password(self, password: str) -> str:
         """Encrypt password using NSE's encryption method"""
         try:
-            # Decode the base64 secret key
-            key = base64.b64decode(self.secret_key)
-            
-            # Create cipher
-            cipher = Cipher(algorithms.AES(key), modes.ECB(), backend=default_backend())
-            encryptor = cipher.encryptor()
+            # Decode the base64 secret key and create the cipher once; ECB keeps
+            # no state between messages, so each call just needs a new encryptor
+            if self._cipher is None:
+                key = base64.b64decode(self.secret_key)
+                self._cipher = Cipher(algorithms.AES(key), modes.ECB(), backend=default_backend())
+            encryptor = self._cipher.encryptor()
             
             # Apply PKCS7 padding
             padder = padding.PKCS7(128).padder()
@@ -189,13 +382,13 @@ class NSEMemberBackupBot:
             return base64.b64encode(encrypted).decode('utf-8')
             
         except Exception as e:
-            self.logger.error(f"Password encryption failed: {e}")
+            self.logger.error("Password encryption failed: %s", e)
             raise
     
     def login(self) -> bool:
         """Login to NSE extranet"""
         try:
-            self.logger.info(f"Attempting login for member {self.member_code}")
+            self.logger.info("Attempting login for member %s", self.member_code)
             
             # Encrypt password
             encrypted_password = self.encrypt_password(self.password)
@@ -207,25 +400,15 @@ class NSEMemberBackupBot:
                 "password": encrypted_password
             }
             
-            # Make sure session exists
-            if self.session is None:
-                self.setup_session()
-                
-            # Make sure session is initialized after setup
-            if self.session is None:
-                self.logger.error("Failed to initialize session")
-                return False
-                
             # Make login request
             response = self.session.post(
                 self.endpoints['login'],
                 json=login_data,
-                timeout=30,
-                verify=False
+                timeout=30
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _parse_json(response)
                 
                 # Check for both 'code' and 'responseCode' fields (like working version)
                 code = result.get('code') or result.get('responseCode')
@@ -239,7 +422,7 @@ class NSEMemberBackupBot:
                         'Authorization': f'Bearer {self.session_token}'
                     })
                     
-                    self.logger.info(f"NSE login successful for member: {self.member_code}")
+                    self.logger.info("NSE login successful for member: %s", self.member_code)
                     return True
                 elif status == 'success' and token:
                     # Alternative success check
@@ -248,21 +431,24 @@ class NSEMemberBackupBot:
                         'Authorization': f'Bearer {self.session_token}'
                     })
                     
-                    self.logger.info(f"NSE login successful for member: {self.member_code}")
+                    self.logger.info("NSE login successful for member: %s", self.member_code)
                     return True
                 else:
-                    self.logger.error(f"Login failed: {result}")
+                    self.logger.error("Login failed: %s", result)
                     return False
             else:
-                self.logger.error(f"Login request failed: HTTP {response.status_code}")
+                self.logger.error("Login request failed: HTTP %s", response.status_code)
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Login exception: {e}")
+            self.logger.error("Login exception: %s", e)
             return False
     
     def check_segment_access(self) -> Dict[str, bool]:
-        """Check which segments the member has access to"""
+        """Check which segments the member has access to
+        
+        Diagnostic only: downloads learn access from the listings themselves.
+        """
         self.logger.info("Checking segment access permissions...")
         access_status = {}
         
@@ -270,98 +456,78 @@ class NSEMemberBackupBot:
             self.logger.error("Not logged in")
             return access_status
         
-        # Ensure session is initialized before accessing it
-        if self.session is None:
-            self.setup_session()
-            
-        # Make sure session is initialized after setup
-        if self.session is None:
-            self.logger.error("Failed to initialize session")
-            return access_status
-            
-        for segment in ['CM', 'FO', 'CD', 'CO', 'SLB']:
-            try:
-                # Try to list root path for each segment
-                list_url = f"{self.endpoints['content_list']}?segment={segment}&folderPath=/"
-                
-                response = self.session.get(
-                    list_url,
-                    headers={
-                        'Authorization': f'Bearer {self.session_token}',
-                        'Accept': 'application/json'
-                    },
-                    timeout=30,
-                    verify=False
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    code = result.get('code') or result.get('responseCode')
-                    
-                    # Check for specific error codes
-                    if code == '720' or code == ['720']:
-                        self.logger.warning(f"  ❌ {segment}: No access (Error 720)")
-                        access_status[segment] = False
-                    elif code == '704' or code == ['704']:
-                        self.logger.warning(f"  ❌ {segment}: Not eligible (Error 704)")
-                        access_status[segment] = False
-                    elif code == '601' or code == ['601']:
-                        self.logger.info(f"  ✅ {segment}: Access granted")
-                        access_status[segment] = True
-                    else:
-                        self.logger.warning(f"  ⚠️  {segment}: Unknown status ({code})")
-                        access_status[segment] = False
-                else:
-                    self.logger.warning(f"  ❌ {segment}: HTTP {response.status_code}")
-                    access_status[segment] = False
-                    
-            except Exception as e:
-                self.logger.error(f"  ❌ {segment}: Error - {e}")
-                access_status[segment] = False
+        # Each probe is one independent round trip; run them concurrently
+        with ThreadPoolExecutor(max_workers=len(ACCESS_SEGMENTS)) as executor:
+            access_status = dict(executor.map(self._probe_segment, ACCESS_SEGMENTS))
+        self._segment_access.update(access_status)
         
         # Summary
         accessible = [seg for seg, access in access_status.items() if access]
         if accessible:
-            self.logger.info(f"\n✅ Accessible segments: {', '.join(accessible)}")
+            self.logger.info("\n✅ Accessible segments: %s", ', '.join(accessible))
         else:
             self.logger.warning("\n⚠️  No segments are accessible with current credentials")
         
         return access_status
     
+    def _probe_segment(self, segment: str) -> Tuple[str, bool]:
+        """List a segment's root path to see whether the member can access it"""
+        try:
+            # Try to list root path for the segment
+            response = self.session.get(
+                self.endpoints['content_list'],
+                params={'segment': segment, 'folderPath': '/'},
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                result = _parse_json(response)
+                code = result.get('code') or result.get('responseCode')
+                
+                # Check for specific error codes
+                if code == '720' or code == ['720']:
+                    self.logger.warning("  ❌ %s: No access (Error 720)", segment)
+                    return segment, False
+                elif code == '704' or code == ['704']:
+                    self.logger.warning("  ❌ %s: Not eligible (Error 704)", segment)
+                    return segment, False
+                elif code == '601' or code == ['601']:
+                    self.logger.info("  ✅ %s: Access granted", segment)
+                    return segment, True
+                else:
+                    self.logger.warning("  ⚠️  %s: Unknown status (%s)", segment, code)
+                    return segment, False
+            else:
+                self.logger.warning("  ❌ %s: HTTP %s", segment, response.status_code)
+                return segment, False
+                
+        except Exception as e:
+            self.logger.error("  ❌ %s: Error - %s", segment, e)
+            return segment, False
+    
+    def segment_accessible(self, segment: str) -> Optional[bool]:
+        """Access learned from earlier listings; None if the segment was not listed yet"""
+        return self._segment_access.get(segment)
+    
     def discover_folder_structure(self, segment: str) -> Optional[str]:
         """Discover the actual folder structure for a segment"""
-        self.logger.info(f"Discovering folder structure for segment: {segment}")
-        
-        # Ensure session is initialized before accessing it
-        if self.session is None:
-            self.setup_session()
-            
-        # Make sure session is initialized after setup
-        if self.session is None:
-            self.logger.error("Failed to initialize session")
-            return None
+        self.logger.info("Discovering folder structure for segment: %s", segment)
         
         # Start with root path
         try:
-            list_url = f"{self.endpoints['content_list']}?segment={segment}&folderPath=/"
-            
             response = self.session.get(
-                list_url,
-                headers={
-                    'Authorization': f'Bearer {self.session_token}',
-                    'Accept': 'application/json'
-                },
-                timeout=30,
-                verify=False
+                self.endpoints['content_list'],
+                params={'segment': segment, 'folderPath': '/'},
+                timeout=30
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _parse_json(response)
                 code = result.get('code') or result.get('responseCode')
                 
                 if code == '601' or code == ['601']:
                     items = result.get('data', [])
-                    self.logger.info(f"Root folder contains {len(items)} items")
+                    self.logger.info("Root folder contains %s items", len(items))
                     
                     # Look for Onlinebackup folder directly or member-specific folders
                     for item in items:
@@ -372,7 +538,7 @@ class NSEMemberBackupBot:
                             name = str(item)
                             item_type = 'unknown'
                         
-                        self.logger.debug(f"Found item: {name} (type: {item_type})")
+                        self.logger.debug("Found item: %s (type: %s)", name, item_type)
                         
                         # Check for Onlinebackup folder
                         if 'Onlinebackup' in name:
@@ -389,36 +555,21 @@ class NSEMemberBackupBot:
                     self.logger.info("No Onlinebackup folder found, using root path")
                     return "/"
         except Exception as e:
-            self.logger.error(f"Error discovering folder structure: {e}")
+            self.logger.error("Error discovering folder structure: %s", e)
         
         return None
     
     def _check_subfolder(self, segment: str, parent_path: str) -> Optional[str]:
         """Check subfolders for Onlinebackup"""
         try:
-            # Ensure session is initialized before accessing it
-            if self.session is None:
-                self.setup_session()
-                
-            # Make sure session is initialized after setup
-            if self.session is None:
-                self.logger.error("Failed to initialize session")
-                return None
-                
-            list_url = f"{self.endpoints['content_list']}?segment={segment}&folderPath={parent_path}"
-            
             response = self.session.get(
-                list_url,
-                headers={
-                    'Authorization': f'Bearer {self.session_token}',
-                    'Accept': 'application/json'
-                },
-                timeout=30,
-                verify=False
+                self.endpoints['content_list'],
+                params={'segment': segment, 'folderPath': parent_path},
+                timeout=30
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _parse_json(response)
                 code = result.get('code') or result.get('responseCode')
                 
                 if code == '601' or code == ['601']:
@@ -440,16 +591,10 @@ class NSEMemberBackupBot:
     def get_file_list(self, segment: str) -> List[Dict]:
         """Get list of available files for a segment"""
         try:
-            self.logger.info(f"Fetching file list for segment: {segment}")
+            self.logger.info("Fetching file list for segment: %s", segment)
             
-            # Ensure session is initialized before accessing it
-            if self.session is None:
-                self.setup_session()
-                
-            # Make sure session is initialized after setup
-            if self.session is None:
-                self.logger.error("Failed to initialize session")
-                return []
+            # Membership checks for the listed files then hit a set, not the database
+            self._load_downloaded_ids(segment)
             
             # Try different folder paths in order of likelihood
             possible_paths = [
@@ -479,92 +624,157 @@ class NSEMemberBackupBot:
                     "/slbftp"
                 ])
             
-            # Try each path until we find files
-            for folder_path in possible_paths:
-                self.logger.info(f"Trying path: {folder_path}")
-                
-                # Construct URL with query parameters
-                list_url = f"{self.endpoints['content_list']}?segment={segment}&folderPath={folder_path}"
-                
-                response = self.session.get(
-                    list_url,
-                    headers={
-                        'Authorization': f'Bearer {self.session_token}',
-                        'Accept': 'application/json'
-                    },
-                    timeout=30,
-                    verify=False
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    self.logger.debug(f"API Response for {segment} at {folder_path}: {result}")
-                    
-                    # Handle multiple response formats
-                    code = result.get('code') or result.get('responseCode')
-                    status = result.get('status')
-                    
-                    # Handle code as either string or list
-                    if code == '601' or code == ['601'] or status == 'success':
-                        files = result.get('data', [])
-                        
-                        self.logger.debug(f"Raw files data: {files}")
-                        
-                        # Process files
-                        processed_files = []
-                        for f in files:
-                            if isinstance(f, dict):
-                                # Check if it's a file (not a folder)
-                                if f and f.get('type') != 'Folder':
-                                    # Get filename from either 'fileName' or 'name'
-                                    filename = f.get('fileName') or f.get('name', '')
-                                    
-                                    # Accept various file types
-                                    if filename and (filename.endswith('.gz') or filename.endswith('.csv') or 
-                                                   filename.endswith('.txt') or '.' in filename):
-                                        # Create file object
-                                        file_obj = {
-                                            'name': filename,
-                                            'fileName': filename,
-                                            'id': filename,
-                                            'fileSize': f.get('size', 0) or f.get('fileSize', 0),
-                                            'lastModified': f.get('lastUpdated') or f.get('lastModified'),
-                                            'folderPath': folder_path,
-                                            'isFolder': False
-                                        }
-                                        processed_files.append(file_obj)
-                            elif isinstance(f, str):
-                                # If response is just filenames
-                                if '.' in f:  # Any file with extension
-                                    processed_files.append({
-                                        'name': f,
-                                        'fileName': f,
-                                        'id': f,
-                                        'folderPath': folder_path
-                                    })
-                        
+            # Reuse the path found on an earlier run while it still lists files
+            cached_path = self._path_cache.get(segment)
+            if cached_path is not None:
+                try:
+                    processed_files, access = self._list_files_at(segment, cached_path)
+                except Exception as e:
+                    self.logger.debug("Cached path %s failed: %s", cached_path, e)
+                    processed_files, access = [], None
+                if processed_files:
+                    self.logger.info("Found %s files for segment %s at path %s", len(processed_files), segment, cached_path)
+                    self._note_segment_access(segment, True)
+                    return processed_files
+                if access is False:
+                    self._note_segment_access(segment, False)
+                    if self._segment_access.get(segment) is False:
+                        self.logger.warning("No access to segment %s", segment)
+                        return []
+                self._set_segment_path(segment, None)
+            
+            # Probe the candidate paths in order of likelihood, a small batch at a
+            # time, and take the first one with files; no probe outlives this call
+            seen_access = set()
+            with ThreadPoolExecutor(max_workers=PATH_PROBE_BATCH) as executor:
+                for start in range(0, len(possible_paths), PATH_PROBE_BATCH):
+                    batch = possible_paths[start:start + PATH_PROBE_BATCH]
+                    futures = [executor.submit(self._list_files_at, segment, folder_path)
+                               for folder_path in batch]
+                    for folder_path, future in zip(batch, futures):
+                        processed_files, access = future.result()
+                        seen_access.add(access)
                         if processed_files:
-                            self.logger.info(f"Found {len(processed_files)} files for segment {segment} at path {folder_path}")
+                            self.logger.info("Found %s files for segment %s at path %s", len(processed_files), segment, folder_path)
+                            self._note_segment_access(segment, True)
+                            self._set_segment_path(segment, folder_path)
                             return processed_files
-                        else:
-                            self.logger.info(f"No files found at {folder_path}, trying next path...")
-                            
-                elif response.status_code == 404:
-                    self.logger.debug(f"Path not found: {folder_path}")
-                    continue
-                else:
-                    self.logger.debug(f"HTTP {response.status_code} for path: {folder_path}")
-                    continue
+            
+            # No path had files: any path that answered 601 proves access
+            if True in seen_access:
+                self._note_segment_access(segment, True)
+            elif False in seen_access:
+                self._note_segment_access(segment, False)
             
             # If no files found in any path
-            self.logger.error(f"No files found for segment {segment} in any of the tried paths")
+            if self._segment_access.get(segment) is False:
+                self.logger.warning("No access to segment %s", segment)
+            else:
+                self.logger.error("No files found for segment %s in any of the tried paths", segment)
             return []
             
         except Exception as e:
-            self.logger.error(f"Error getting file list for {segment}: {e}")
+            self.logger.error("Error getting file list for %s: %s", segment, e)
             return []
     
+    def _set_segment_path(self, segment: str, folder_path: Optional[str]):
+        """Remember (or with None, forget) where a segment's files are listed"""
+        with self._db_lock:
+            try:
+                if folder_path is None:
+                    self._path_cache.pop(segment, None)
+                    self._db_conn.execute('DELETE FROM segment_paths WHERE segment = ?', (segment,))
+                else:
+                    self._path_cache[segment] = folder_path
+                    self._db_conn.execute('''
+                        INSERT OR REPLACE INTO segment_paths (segment, folder_path, updated_at)
+                        VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ''', (segment, folder_path))
+            except sqlite3.Error as e:
+                self.logger.warning("Could not save folder path for %s: %s", segment, e)
+    
+    def _note_segment_access(self, segment: str, access: bool):
+        """Record segment access learned from a listing; a True is never downgraded"""
+        if access or self._segment_access.get(segment) is not True:
+            self._segment_access[segment] = access
+    
+    def _list_files_at(self, segment: str, folder_path: str) -> Tuple[List[Dict], Optional[bool]]:
+        """List the files in one folder path of a segment
+        
+        Returns the files ([] if none or unavailable) and the access the listing
+        reported (True for 601, False for 720/704, None if it said neither).
+        """
+        self.logger.info("Trying path: %s", folder_path)
+        
+        # Let requests encode the query parameters
+        response = self.session.get(
+            self.endpoints['content_list'],
+            params={'segment': segment, 'folderPath': folder_path},
+            timeout=30
+        )
+        
+        if response.status_code == 200:
+            result = _parse_json(response)
+            
+            self.logger.debug("API Response for %s at %s: %s", segment, folder_path, result)
+            
+            # Handle multiple response formats
+            code = result.get('code') or result.get('responseCode')
+            status = result.get('status')
+            
+            # Every listing reports access, so no separate pre-flight probe is needed
+            if code in ('720', '704', ['720'], ['704']):
+                self.logger.warning("  ❌ %s: No access (Error %s)", segment, code)
+                return [], False
+            
+            # Handle code as either string or list
+            if code == '601' or code == ['601'] or status == 'success':
+                files = result.get('data', [])
+                
+                self.logger.debug("Raw files data: %s", files)
+                
+                # Process files
+                processed_files = []
+                for f in files:
+                    if isinstance(f, dict):
+                        # Check if it's a file (not a folder)
+                        if f and f.get('type') != 'Folder':
+                            # Get filename from either 'fileName' or 'name'
+                            filename = f.get('fileName') or f.get('name', '')
+                            
+                            # Accept any file with an extension (.gz, .csv, .txt, ...)
+                            if filename and '.' in filename:
+                                # Create file object
+                                file_obj = {
+                                    'name': filename,
+                                    'fileName': filename,
+                                    'id': filename,
+                                    'fileSize': f.get('size', 0) or f.get('fileSize', 0),
+                                    'lastModified': f.get('lastUpdated') or f.get('lastModified'),
+                                    'folderPath': folder_path,
+                                    'isFolder': False
+                                }
+                                processed_files.append(file_obj)
+                    elif isinstance(f, str):
+                        # If response is just filenames
+                        if '.' in f:  # Any file with extension
+                            processed_files.append({
+                                'name': f,
+                                'fileName': f,
+                                'id': f,
+                                'folderPath': folder_path
+                            })
+                
+                if not processed_files:
+                    self.logger.info("No files found at %s, trying next path...", folder_path)
+                return processed_files, True
+                    
+        elif response.status_code == 404:
+            self.logger.debug("Path not found: %s", folder_path)
+        else:
+            self.logger.debug("HTTP %s for path: %s", response.status_code, folder_path)
+        
+        return [], None
     
     def create_organized_directory(self, segment: str) -> Path:
         """Create base directory structure for segment"""
@@ -573,23 +783,19 @@ class NSEMemberBackupBot:
         segment_dir = self.base_download_dir / segment
         segment_dir.mkdir(parents=True, exist_ok=True)
         
-        self.logger.info(f"Created base directory: {segment_dir}")
+        self.logger.info("Created base directory: %s", segment_dir)
         return segment_dir
     
     def get_file_date_directory(self, segment: str, filename: str) -> Path:
         """Extract date from filename and create appropriate directory structure"""
-        import re
-        
         # Extract date from filename
         date_str = None
         
         # Pattern 1: Trade_NSE_XX_0_TM_06471_YYYYMMDD_X_0000.csv.gz
-        pattern1 = r'Trade_NSE_\w+_\d+_TM_\d+_(\d{8})_'
-        match1 = re.search(pattern1, filename)
+        match1 = _TRADE_DATE_RE.search(filename)
         
         # Pattern 2: XX_ORD_LOG_DDMMYYYY_06471.CSV.gz
-        pattern2 = r'_ORD_LOG_(\d{8})_'
-        match2 = re.search(pattern2, filename)
+        match2 = _ORDLOG_DATE_RE.search(filename)
         
         if match1:
             date_part = match1.group(1)
@@ -618,28 +824,59 @@ class NSEMemberBackupBot:
         }
         month_name = month_names.get(month, month)
         
-        # Create the organized path: segment/year/month/day/
-        organized_path = self.base_download_dir / segment / year / month_name / day
-        organized_path.mkdir(parents=True, exist_ok=True)
+        # Many files share a date; create each directory once per run
+        key = (segment, year, month_name, day)
+        organized_path = self._dir_cache.get(key)
+        if organized_path is not None:
+            return organized_path
+        
+        # Create the organized path: segment/year/month/day/ (one stat when it
+        # already exists from an earlier run, and one Path built at the end)
+        organized_dir = os.path.join(self.base_download_dir, segment, year, month_name, day)
+        if not os.path.isdir(organized_dir):
+            os.makedirs(organized_dir, exist_ok=True)
+        organized_path = Path(organized_dir)
+        self._dir_cache[key] = organized_path
         
         return organized_path
     
+    def _load_downloaded_ids(self, segment: str) -> set:
+        """Read the file_ids already recorded for a segment in one query"""
+        with self._db_lock:
+            cursor = self._db_conn.execute(
+                'SELECT file_id FROM bot_file_downloads WHERE segment = ?', (segment,))
+            ids = {row[0] for row in cursor}
+            self._downloaded_ids[segment] = ids
+            return ids
+    
     def is_file_downloaded(self, file_id: str, segment: str) -> bool:
         """Check if file is already downloaded"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT COUNT(*) FROM bot_file_downloads 
-                    WHERE file_id = ? AND segment = ?
-                ''', (file_id, segment))
-                
-                return cursor.fetchone()[0] > 0
+            ids = self._downloaded_ids.get(segment)
+            if ids is None:
+                ids = self._load_downloaded_ids(segment)
+            return file_id in ids
         except Exception as e:
-            self.logger.error(f"Error checking file download status: {e}")
+            self.logger.error("Error checking file download status: %s", e)
             return False
     
-    def download_file(self, file_info: Dict, segment: str, base_dir: Path, folder_path: str) -> Dict:
+    def _chunk_size(self) -> int:
+        """Copy block size worth ~CHUNK_TARGET_SECONDS at the measured download rate"""
+        if not self._bw_ewma:
+            return DOWNLOAD_CHUNK_SIZE
+        return min(CHUNK_SIZE_MAX, max(CHUNK_SIZE_MIN, int(self._bw_ewma * CHUNK_TARGET_SECONDS)))
+    
+    def _record_bandwidth(self, nbytes: int, elapsed: float):
+        """Fold one file's transfer rate into the moving average"""
+        if nbytes <= 0 or elapsed <= 0:
+            return
+        rate = nbytes / elapsed
+        if self._bw_ewma:
+            rate = BANDWIDTH_EWMA_ALPHA * self._bw_ewma + (1 - BANDWIDTH_EWMA_ALPHA) * rate
+        self._bw_ewma = rate
+    
+    def download_file(self, file_info: Dict, segment: str, base_dir: Path, folder_path: str,
+                      download_date: Optional[date] = None) -> Dict:
         """Download a single file with enhanced error handling"""
         try:
             # Extract file information based on NSE API response structure
@@ -660,7 +897,7 @@ class NSEMemberBackupBot:
             
             # Check if already downloaded
             if self.is_file_downloaded(file_id, segment):
-                self.logger.info(f"File {file_name} already downloaded previously")
+                self.logger.info("File %s already downloaded previously", file_name)
                 return {
                     'success': True,
                     'file_name': file_name,
@@ -668,15 +905,14 @@ class NSEMemberBackupBot:
                     'size': 0
                 }
             
-            self.logger.info(f"Downloading {file_name} for segment {segment}")
+            self.logger.info("Downloading %s for segment %s", file_name, segment)
             
             # Extract date from filename if present
             date_str = None
-            import re
             
             # Try different date patterns
             # Pattern 1: DDMMYYYY
-            date_match = re.search(r'(\d{8})', file_name)
+            date_match = _GENERIC_DATE_RE.search(file_name)
             if date_match:
                 date_part = date_match.group(1)
                 # Check if it's DDMMYYYY format
@@ -686,91 +922,128 @@ class NSEMemberBackupBot:
                 elif int(date_part[:4]) >= 2000:
                     date_str = f"{date_part[6:]}-{date_part[4:6]}-{date_part[:4]}"
             
-            # Ensure session is initialized before accessing it
-            if self.session is None:
-                self.setup_session()
-                
-            # Make sure session is initialized after setup
-            if self.session is None:
-                self.logger.error("Failed to initialize session")
-                return {
-                    'success': False,
-                    'file_name': file_name,
-                    'error': 'Session initialization failed'
-                }
-            
-            # Construct download URL with query parameters (like working version)
-            download_url = f"{self.endpoints['file_download']}?segment={segment}&folderPath={folder_path}&filename={file_name}"
+            # Query parameters (like working version); requests encodes them
+            params = {'segment': segment, 'folderPath': folder_path, 'filename': file_name}
             
             # Add date if found
             if date_str:
-                download_url += f"&date={date_str}"
+                params['date'] = date_str
             
+            # Save file to segment directory, via a temp file
+            temp_path = target_dir / f"{file_name}.tmp"
+            final_path = target_dir / file_name
+            
+            # A plain file left part-way by an interrupted run is resumed with
+            # a Range request, guarded by If-Range on the ETag/Last-Modified
+            # saved next to it. .gz files are decompressed while streaming, so
+            # their temp file doesn't map onto a byte offset of the download.
+            validator_path = target_dir / f"{file_name}.tmp.validator"
+            resumable = not file_name.endswith('.gz')
+            resume_from = 0
+            if resumable and temp_path.is_file():
+                try:
+                    validator = validator_path.read_text().strip()
+                except OSError:
+                    validator = ''  # No validator: the partial file can't be trusted
+                if validator:
+                    resume_from = temp_path.stat().st_size
+            
+            chunk_size = self._chunk_size()
+            started = time.monotonic()
+            headers = {'Accept': '*/*'}  # Important: use */* like working bot
+            if resume_from:
+                headers['Range'] = f'bytes={resume_from}-'
+                headers['If-Range'] = validator
             response = self.session.get(
-                download_url,
-                headers={
-                    'Authorization': f'Bearer {self.session_token}',
-                    'Accept': '*/*'  # Important: use */* like working bot
-                },
-                timeout=300,  # 5 minutes timeout for large files
-                verify=False,
+                self.endpoints['file_download'],
+                params=params,
+                headers=headers,
+                timeout=(10, 300),  # Connect, then up to 5 minutes between reads for large files
                 stream=True
             )
             
-            if response.status_code == 200:
-                # Save file to segment directory
-                temp_filename = f"{file_name}.tmp"
-                temp_path = target_dir / temp_filename
-                final_path = target_dir / file_name
-                
+            if resume_from and (response.status_code == 416 or (
+                    response.status_code == 206
+                    and _range_start(response.headers.get('Content-Range')) != resume_from)):
+                # The partial file no longer fits what the server has; start over
+                response.close()
+                temp_path.unlink(missing_ok=True)
+                validator_path.unlink(missing_ok=True)
+                resume_from = 0
+                del headers['Range'], headers['If-Range']
+                response = self.session.get(
+                    self.endpoints['file_download'],
+                    params=params,
+                    headers=headers,
+                    timeout=(10, 300),
+                    stream=True
+                )
+            
+            if response.status_code == 200 or (
+                    response.status_code == 206
+                    and _range_start(response.headers.get('Content-Range')) == resume_from):
                 # Download to temp file first
                 total_size = 0
                 try:
-                    with open(temp_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                total_size += len(chunk)
+                    if response.status_code == 200:
+                        # Range not honoured (or If-Range failed): the full file is
+                        # coming; remember what it is so a cut-off copy can resume
+                        resume_from = 0
+                        validator = _resume_validator(response.headers) if resumable else None
+                        if validator:
+                            validator_path.write_text(validator)
+                        else:
+                            validator_path.unlink(missing_ok=True)
                     
-                    # Verify and decompress if .gz
-                    if file_name.endswith('.gz'):
-                        try:
-                            with gzip.open(temp_path, 'rb') as gz_file:
-                                decompressed_content = gz_file.read()
-                            
-                            # Save decompressed file
-                            decompressed_filename = file_name[:-3]
-                            decompressed_path = target_dir / decompressed_filename
-                            
-                            with open(decompressed_path, 'wb') as f:
-                                f.write(decompressed_content)
-                            
-                            self.logger.info(f"✅ Decompressed {file_name} -> {decompressed_filename}")
-                            
-                            # Remove temp .gz file after successful decompression
-                            try:
-                                temp_path.unlink()
-                            except Exception:
-                                pass
-                                
-                            # Use decompressed file for checksum
-                            final_path = decompressed_path
-                            
-                        except Exception as e:
-                            self.logger.warning(f"Could not decompress {file_name}: {e}")
-                            # If decompression fails, rename temp to final
-                            temp_path.rename(final_path)
+                    # decode_content still undoes any transfer encoding; the
+                    # buffered reader lets us look at the gzip magic up front
+                    response.raw.decode_content = True
+                    stream = io.BufferedReader(response.raw, chunk_size)
+                    is_gzip = stream.peek(2)[:2] == GZIP_MAGIC
+                    
+                    if file_name.endswith('.gz') and is_gzip:
+                        # Decompress straight off the socket in large blocks: the
+                        # .gz is never written to disk or held in memory whole
+                        decompressed_filename = file_name[:-3]
+                        with igzip.GzipFile(fileobj=stream) as gz_file, open(temp_path, 'wb') as f:
+                            checksum = _copy_and_hash(gz_file, f, chunk_size=chunk_size)
+                            _drop_page_cache(f)
+                        total_size = response.raw.tell()
+                        
+                        final_path = target_dir / decompressed_filename
+                        os.replace(temp_path, final_path)
+                        self.logger.info("✅ Decompressed %s -> %s", file_name, decompressed_filename)
                     else:
-                        # Not a .gz file, just rename temp to final
-                        temp_path.rename(final_path)
+                        if file_name.endswith('.gz'):
+                            # Keep the file as received, like a failed decompression did
+                            self.logger.warning("Could not decompress %s: %s", file_name, "not a gzip stream")
+                        
+                        # Copy the socket stream straight to disk in large blocks,
+                        # without building a Python object per 8 KiB chunk
+                        sha256_hash = None
+                        if resume_from:
+                            # Append to the partial file; hash what it already holds first
+                            self.logger.info("Resuming %s from byte %s", file_name, format(resume_from, ','))
+                            sha256_hash = hashlib.sha256()
+                            with open(temp_path, 'rb') as f:
+                                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                                    sha256_hash.update(chunk)
+                        with open(temp_path, 'ab' if resume_from else 'wb') as f:
+                            checksum = _copy_and_hash(stream, f, sha256_hash, chunk_size)
+                            total_size = f.tell()
+                            _drop_page_cache(f)
+                        os.replace(temp_path, final_path)
+                        validator_path.unlink(missing_ok=True)
                     
-                    # Calculate checksum
-                    checksum = self.calculate_file_checksum(final_path)
+                    # Bytes that crossed the wire this time, for the next file's block size
+                    self._record_bandwidth(response.raw.tell(), time.monotonic() - started)
                     
-                    # Record download in database
-                    self.record_download(file_id, file_name, segment, final_path, total_size, checksum)
+                    # Record download in database (the checksum was taken on
+                    # the way to disk, so the file is not read back to hash it)
+                    self.record_download(file_id, file_name, segment, final_path, total_size, checksum,
+                                         download_date)
                     
-                    self.logger.info(f"Successfully downloaded {file_name} ({total_size:,} bytes)")
+                    self.logger.info("Successfully downloaded %s (%s bytes)", file_name, format(total_size, ','))
                     
                     return {
                         'success': True,
@@ -781,28 +1054,33 @@ class NSEMemberBackupBot:
                     }
                     
                 except Exception as e:
-                    # Clean up temp file on error
-                    if temp_path.exists():
+                    # Release the connection and clean up temp file on error;
+                    # a plain file cut off mid-transfer is kept so it can resume
+                    response.close()
+                    transfer_error = isinstance(e, (urllib3.exceptions.HTTPError,
+                                                    requests.exceptions.RequestException))
+                    if not (resumable and transfer_error):
                         try:
-                            temp_path.unlink()
-                        except:
-                            pass
+                            temp_path.unlink(missing_ok=True)
+                            validator_path.unlink(missing_ok=True)
+                        except OSError:
+                            self.logger.debug("Could not remove %s", temp_path, exc_info=True)
                     raise e
             else:
                 error_msg = f"Download failed: HTTP {response.status_code}"
                 
                 # Try to get error details from response
                 try:
-                    error_data = response.json()
+                    error_data = _parse_json(response)
                     code = error_data.get('code') or error_data.get('responseCode')
                     if code:
                         error_msg = f"API error code: {code}"
                     elif 'message' in error_data:
                         error_msg = error_data['message']
-                except:
+                except (ValueError, AttributeError):  # Not JSON, or not an object
                     pass
                 
-                self.logger.error(f"Failed to download {file_name}: {error_msg}")
+                self.logger.error("Failed to download %s: %s", file_name, error_msg)
                 
                 return {
                     'success': False,
@@ -812,7 +1090,7 @@ class NSEMemberBackupBot:
                 
         except Exception as e:
             error_msg = f"Download exception: {str(e)}"
-            self.logger.error(f"Error downloading {file_info.get('name', 'unknown')}: {error_msg}")
+            self.logger.error("Error downloading %s: %s", file_info.get('name', 'unknown'), error_msg)
             
             return {
                 'success': False,
@@ -820,40 +1098,81 @@ class NSEMemberBackupBot:
                 'error': error_msg
             }
     
-    def calculate_file_checksum(self, file_path: Path) -> str:
-        """Calculate SHA-256 checksum of file"""
-        try:
-            sha256_hash = hashlib.sha256()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
-        except Exception as e:
-            self.logger.error(f"Error calculating checksum: {e}")
-            return ""
-    
     def record_download(self, file_id: str, file_name: str, segment: str, 
-                       file_path: Path, file_size: int, checksum: str):
-        """Record successful download in database"""
-        try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO bot_file_downloads 
-                    (file_id, file_name, segment, download_date, file_path, file_size, checksum)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (file_id, file_name, segment, datetime.now().date(), 
-                      str(file_path), file_size, checksum))
-                conn.commit()
-        except Exception as e:
-            self.logger.error(f"Error recording download: {e}")
+                       file_path: Path, file_size: int, checksum: str,
+                       download_date: Optional[date] = None):
+        """Record successful download; written to the database in batches"""
+        if download_date is None:
+            download_date = datetime.now().date()
+        with self._db_lock:
+            self._pending_downloads.append((file_id, file_name, segment, download_date,
+                                            str(file_path), file_size, checksum))
+            if segment in self._downloaded_ids:
+                self._downloaded_ids[segment].add(file_id)
+            if len(self._pending_downloads) >= RECORD_BATCH_SIZE:
+                self.flush_downloads()
+    
+    def flush_downloads(self):
+        """Write buffered download records in a single transaction"""
+        with self._db_lock:
+            if not self._pending_downloads:
+                return
+            conn = self._db_conn
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(SQL_INSERT_DOWNLOAD, self._pending_downloads)
+                conn.execute('COMMIT')
+                self._pending_downloads.clear()
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                self.logger.error("Error recording downloads: %s", e)
+    
+    def _download_paced(self, file_info: Dict, segment: str, base_dir: Path,
+                        download_date: Optional[date] = None) -> Dict:
+        """Download one file, then pause before the worker's next request"""
+        # Get folder path from file info
+        folder_path = file_info.get('folderPath', '/Onlinebackup')
+        
+        result = self.download_file(file_info, segment, base_dir, folder_path, download_date)
+        
+        # Small delay between downloads (skipped files made no request)
+        if result.get('status') != 'already_downloaded':
+            time.sleep(DOWNLOAD_DELAY)
+        return result
+    
+    def _report_download(self, idx: int, total: int, file_info: Dict, result: Dict):
+        """Print and log the outcome of one file download"""
+        file_name = file_info.get('fileName') or file_info.get('name', 'unknown')
+        verbose = self.verbose
+        if verbose:
+            print(f"[{idx}/{total}] Processing: {file_name}")
+        self.logger.info("\n[%s/%s] Processing: %s", idx, total, file_name)
+        
+        if result['success']:
+            if result.get('status') != 'already_downloaded':
+                size = result.get('size', 0)
+                if verbose:
+                    print(f"✅ Downloaded {file_name} ({size:,} bytes)")
+                # Only pay for the size formatting when INFO is actually logged
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info("✅ Downloaded %s (%s bytes / %.2f MB)", file_name,
+                                     format(size, ','), size / 1048576.0)
+            else:
+                if verbose:
+                    print(f"⏭️  Skipped {file_name} - already downloaded previously")
+                self.logger.info("⏭️  Skipped %s - already downloaded previously", file_name)
+        else:
+            error_msg = result.get('error', 'Unknown error')
+            print(f"❌ Failed: {error_msg}")
+            self.logger.error("❌ Failed to download %s: %s", file_name, error_msg)
     
     def download_segment_files(self, segment: str) -> Dict:
         """Download all files for a specific segment"""
         try:
-            self.logger.info(f"Starting download for segment: {segment}")
+            self.logger.info("Starting download for segment: %s", segment)
             self.logger.info("=" * 50)
-            self.logger.info(f"📂 Processing {segment} segment")
+            self.logger.info("📂 Processing %s segment", segment)
             self.logger.info("=" * 50)
             
             # Ensure we're logged in
@@ -873,7 +1192,14 @@ class NSEMemberBackupBot:
             files = self.get_file_list(segment)
             
             if not files:
-                self.logger.warning(f"No files found in {segment}")
+                if self._segment_access.get(segment) is False:
+                    return {
+                        'success': False,
+                        'error': 'No access to segment',
+                        'files_downloaded': 0,
+                        'files_failed': 0
+                    }
+                self.logger.warning("No files found in %s", segment)
                 return {
                     'success': False,
                     'error': 'No files found',
@@ -881,7 +1207,7 @@ class NSEMemberBackupBot:
                     'files_failed': 0
                 }
             
-            self.logger.info(f"📋 Found {len(files)} files in {segment}")
+            self.logger.info("📋 Found %s files in %s", len(files), segment)
             
             # Download files
             successful_downloads = 0
@@ -893,41 +1219,30 @@ class NSEMemberBackupBot:
             print(f"{'='*60}")
             print(f"📋 Found {len(files)} files in {segment}\n")
             
-            for idx, file_info in enumerate(files, 1):
-                # Print progress
-                file_name = file_info.get('fileName') or file_info.get('name', 'unknown')
-                print(f"[{idx}/{len(files)}] Processing: {file_name}")
-                self.logger.info(f"\n[{idx}/{len(files)}] Processing: {file_name}")
-                
-                # Get folder path from file info
-                folder_path = file_info.get('folderPath', '/Onlinebackup')
-                
-                # Download the file
-                result = self.download_file(file_info, segment, base_dir, folder_path)
+            # One download_date for the whole segment, not a clock read per file
+            today = datetime.now().date()
+            
+            # Download files on a bounded pool of worker threads sharing the
+            # session; results come back in list order for the progress output
+            with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+                results = executor.map(lambda file_info: self._download_paced(file_info, segment, base_dir, today),
+                                       files)
                 
-                if result['success']:
-                    successful_downloads += 1
-                    if result.get('status') != 'already_downloaded':
-                        total_size += result.get('size', 0)
-                        size_mb = result.get('size', 0) / (1024 * 1024)
-                        print(f"✅ Downloaded {file_name} ({result.get('size', 0):,} bytes)")
-                        self.logger.info(f"✅ Downloaded {file_name} ({result.get('size', 0):,} bytes / {size_mb:.2f} MB)")
+                for idx, (file_info, result) in enumerate(zip(files, results), 1):
+                    self._report_download(idx, len(files), file_info, result)
+                    if result['success']:
+                        successful_downloads += 1
+                        if result.get('status') != 'already_downloaded':
+                            total_size += result.get('size', 0)
                     else:
-                        print(f"⏭️  Skipped {file_name} - already downloaded previously")
-                        self.logger.info(f"⏭️  Skipped {file_name} - already downloaded previously")
-                else:
-                    failed_downloads += 1
-                    error_msg = result.get('error', 'Unknown error')
-                    print(f"❌ Failed: {error_msg}")
-                    self.logger.error(f"❌ Failed to download {file_name}: {error_msg}")
-                
-                # Small delay between downloads
-                time.sleep(0.5)
+                        failed_downloads += 1
+            
+            self.flush_downloads()
             
-            self.logger.info(f"\nSegment {segment} download completed:")
-            self.logger.info(f"  ✅ Successful: {successful_downloads}")
-            self.logger.info(f"  ❌ Failed: {failed_downloads}")
-            self.logger.info(f"  💾 Total size: {total_size / (1024 * 1024):.2f} MB")
+            self.logger.info("\nSegment %s download completed:", segment)
+            self.logger.info("  ✅ Successful: %s", successful_downloads)
+            self.logger.info("  ❌ Failed: %s", failed_downloads)
+            self.logger.info("  💾 Total size: %.2f MB", total_size / (1024 * 1024))
             
             print(f"\n{segment} Summary:")
             print(f"  ✅ Downloaded: {successful_downloads} files")
@@ -944,6 +1259,8 @@ class NSEMemberBackupBot:
             }
             
         except Exception as e:
+            # Keep the records of files that did complete
+            self.flush_downloads()
             error_msg = f"Segment download error: {str(e)}"
             self.logger.error(error_msg)
             
@@ -959,28 +1276,10 @@ class NSEMemberBackupBot:
         if segments is None:
             segments = ['CM', 'FO', 'SLB']
         
-        self.logger.info(f"Starting download for segments: {', '.join(segments)}")
-        
-        # Check segment access first
-        access_status = self.check_segment_access()
-        
-        # Filter segments to only those with access
-        accessible_segments = [seg for seg in segments if access_status.get(seg, False)]
-        
-        if not accessible_segments:
-            self.logger.error("No accessible segments found")
-            return {
-                'success': False,
-                'segments_completed': 0,
-                'segments_failed': len(segments),
-                'total_files_downloaded': 0,
-                'total_files_failed': 0,
-                'total_size_mb': 0,
-                'segment_results': {seg: {'success': False, 'error': 'No access'} for seg in segments}
-            }
-        
-        self.logger.info(f"Processing accessible segments: {', '.join(accessible_segments)}")
+        self.logger.info("Starting download for segments: %s", ', '.join(segments))
         
+        # Access is not probed up front: each segment's listing reports it,
+        # and segments without access come back as failed results
         overall_results = {
             'success': True,
             'segments_completed': 0,
@@ -991,17 +1290,8 @@ class NSEMemberBackupBot:
             'segment_results': {}
         }
         
-        # Mark inaccessible segments as failed
+        # Process segments
         for segment in segments:
-            if segment not in accessible_segments:
-                overall_results['segments_failed'] += 1
-                overall_results['segment_results'][segment] = {
-                    'success': False,
-                    'error': 'No access to segment'
-                }
-        
-        # Process accessible segments
-        for segment in accessible_segments:
             try:
                 result = self.download_segment_files(segment)
                 overall_results['segment_results'][segment] = result
@@ -1015,7 +1305,7 @@ class NSEMemberBackupBot:
                     overall_results['segments_failed'] += 1
                     
             except Exception as e:
-                self.logger.error(f"Error processing segment {segment}: {e}")
+                self.logger.error("Error processing segment %s: %s", segment, e)
                 overall_results['segments_failed'] += 1
                 overall_results['segment_results'][segment] = {
                     'success': False,
@@ -1025,9 +1315,10 @@ class NSEMemberBackupBot:
         # Overall success if at least one segment succeeded
         overall_results['success'] = overall_results['segments_completed'] > 0
         
-        self.logger.info(f"Download completed: {overall_results['segments_completed']} segments successful, "
-                        f"{overall_results['segments_failed']} failed, "
-                        f"{overall_results['total_files_downloaded']} files downloaded")
+        self.logger.info("Download completed: %s segments successful, %s failed, %s files downloaded",
+                         overall_results['segments_completed'],
+                         overall_results['segments_failed'],
+                         overall_results['total_files_downloaded'])
         
         return overall_results
     
@@ -1036,51 +1327,51 @@ class NSEMemberBackupBot:
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                
-                # Overall statistics
-                cursor.execute('''
-                    SELECT 
-                        COUNT(*) as total_files,
-                        SUM(file_size) as total_size,
-                        COUNT(DISTINCT segment) as segments_used,
-                        COUNT(DISTINCT download_date) as days_active
-                    FROM bot_file_downloads 
-                    WHERE created_at >= ?
-                ''', (cutoff_date,))
-                
-                overall_stats = cursor.fetchone()
-                
-                # Per-segment statistics
-                cursor.execute('''
-                    SELECT 
-                        segment,
-                        COUNT(*) as files,
-                        SUM(file_size) as size
-                    FROM bot_file_downloads 
-                    WHERE created_at >= ?
-                    GROUP BY segment
-                ''', (cutoff_date,))
-                
-                segment_stats = cursor.fetchall()
-                
-                return {
-                    'period_days': days,
-                    'total_files': overall_stats[0] or 0,
-                    'total_size_mb': (overall_stats[1] or 0) / (1024 * 1024),
-                    'segments_used': overall_stats[2] or 0,
-                    'days_active': overall_stats[3] or 0,
-                    'segment_breakdown': {
-                        row[0]: {
-                            'files': row[1],
-                            'size_mb': row[2] / (1024 * 1024)
-                        } for row in segment_stats
-                    }
+            self.flush_downloads()
+            cursor = self._db_conn.cursor()
+            
+            # Overall statistics
+            cursor.execute('''
+                SELECT 
+                    COUNT(*) as total_files,
+                    SUM(file_size) as total_size,
+                    COUNT(DISTINCT segment) as segments_used,
+                    COUNT(DISTINCT download_date) as days_active
+                FROM bot_file_downloads 
+                WHERE created_at >= ?
+            ''', (cutoff_date,))
+            
+            overall_stats = cursor.fetchone()
+            
+            # Per-segment statistics
+            cursor.execute('''
+                SELECT 
+                    segment,
+                    COUNT(*) as files,
+                    SUM(file_size) as size
+                FROM bot_file_downloads 
+                WHERE created_at >= ?
+                GROUP BY segment
+            ''', (cutoff_date,))
+            
+            segment_stats = cursor.fetchall()
+            
+            return {
+                'period_days': days,
+                'total_files': overall_stats[0] or 0,
+                'total_size_mb': (overall_stats[1] or 0) / (1024 * 1024),
+                'segments_used': overall_stats[2] or 0,
+                'days_active': overall_stats[3] or 0,
+                'segment_breakdown': {
+                    row[0]: {
+                        'files': row[1],
+                        'size_mb': row[2] / (1024 * 1024)
+                    } for row in segment_stats
                 }
-                
+            }
+            
         except Exception as e:
-            self.logger.error(f"Error getting statistics: {e}")
+            self.logger.error("Error getting statistics: %s", e)
             return {}
 
 
@@ -1112,12 +1403,10 @@ def main():
         except ImportError:
             # Fallback: manually parse .env file
             try:
-                with open(env_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            os.environ[key.strip()] = value.strip()
+                lines = (line.strip() for line in env_file.read_text().splitlines())
+                pairs = (line.split('=', 1) for line in lines
+                         if line and not line.startswith('#') and '=' in line)
+                os.environ.update({key.strip(): value.strip() for key, value in pairs})
             except Exception as e:
                 print(f"Warning: Could not load .env file: {e}")
     
@@ -1153,6 +1442,7 @@ Examples:
     parser.add_argument('--secret-key', help='NSE Secret Key (overrides .env)')
     parser.add_argument('--download-dir', help='Download directory path (overrides .env)')
     parser.add_argument('--segments', default='CM,FO,SLB', help='Segments to download (comma-separated)')
+    parser.add_argument('--quiet', action='store_true', help='Print segment summaries only, not every file')
     
     args = parser.parse_args()
     
@@ -1195,7 +1485,8 @@ Examples:
         login_id=login_id,
         password=password,
         secret_key=secret_key,
-        download_dir=download_dir
+        download_dir=download_dir,
+        verbose=not args.quiet
     )
     
     try:
@@ -1244,6 +1535,8 @@ Examples:
     except Exception as e:
         print(f"[ERROR] Error: {e}")
         sys.exit(1)
+    finally:
+        bot.close()
 
 
 if __name__ == "__main__":
@@ -17,13 +17,14 @@ import sqlite3
 import shutil
 import winreg
 import base64
+import atexit
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, date, time as dt_time, timedelta
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import pystray
 from PIL import Image, ImageDraw
-import schedule
 import logging
 from typing import Optional, Dict, List, Tuple
 import webbrowser
@@ -39,6 +40,28 @@ APP_NAME = "NSE DataSync Pro"
 APP_VERSION = "2.0 Professional Edition"
 COMPANY_NAME = "DataSync Solutions"
 
+# Rows copied per batch when migrating legacy databases
+MIGRATION_BATCH_SIZE = 10000
+
+# Longest the scheduler thread sleeps before re-checking the wall clock (seconds)
+SCHEDULER_MAX_WAIT = 60
+
+# Applied to the shared connection on the consolidated database; WAL itself is
+# persistent and is switched on once in init_database
+DB_PRAGMAS = '''
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+'''
+
+# Explicit date/datetime conversions (the implicit ones are deprecated in
+# Python 3.12), identical to nse_backup_bot's so import order doesn't matter.
+# With PARSE_DECLTYPES, DATE/TIMESTAMP columns come back as date/datetime.
+sqlite3.register_adapter(datetime, lambda val: val.isoformat())
+sqlite3.register_adapter(date, lambda val: val.isoformat())
+sqlite3.register_converter("TIMESTAMP", lambda val: datetime.fromisoformat(val.decode()))
+sqlite3.register_converter("DATE", lambda val: datetime.fromisoformat(val.decode()).date())
+
 class DesktopShortcutManager:
     """Handles desktop shortcut creation on first run"""
     
@@ -58,18 +81,19 @@ class DesktopShortcutManager:
     @staticmethod
     def _create_windows_shortcut():
         """Create Windows shortcut"""
+        desktop = Path.home() / 'Desktop'
+        shortcut_path = desktop / f'{APP_NAME}.lnk'
+        
+        # Check before loading the COM modules, which is the costly part
+        if shortcut_path.exists():
+            return  # Shortcut already exists
+        
         try:
             import pythoncom  # type: ignore
             from win32com.client import Dispatch  # type: ignore
         except ImportError:
             logging.warning("Windows COM modules not available, skipping shortcut creation")
             return
-        
-        desktop = Path.home() / 'Desktop'
-        shortcut_path = desktop / f'{APP_NAME}.lnk'
-        
-        if shortcut_path.exists():
-            return  # Shortcut already exists
             
         shell = Dispatch('WScript.Shell')
         shortcut = shell.CreateShortCut(str(shortcut_path))
@@ -117,12 +141,31 @@ class EnhancedDatabaseManager:
     
     def __init__(self):
         self.db_path = Path("nse_datasync_pro.db")
+        
+        # One connection for the manager's lifetime; the scheduler's worker
+        # thread shares it with the GUI, so every use goes through the lock
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        self._conn.executescript(DB_PRAGMAS)
+        self._lock = threading.RLock()
+        atexit.register(self._conn.close)
+        self._settings_cache: Optional[Dict[str, str]] = None  # Whole settings table, see get_setting
+        
         self.init_database()
         self.migrate_external_databases()
     
+    @contextmanager
+    def connection(self):
+        """Hold the shared connection for a block: commits on success, rolls back on error"""
+        with self._lock, self._conn:
+            yield self._conn
+    
     def init_database(self):
         """Initialize comprehensive consolidated database schema"""
-        with sqlite3.connect(str(self.db_path)) as conn:
+        with self.connection() as conn:
+            # WAL: commits skip the rollback journal's extra fsync, and the
+            # bot/scheduler writers don't block GUI reads
+            conn.execute('PRAGMA journal_mode=WAL')
             cursor = conn.cursor()
             
             # Existing GUI tables (keep as-is)
@@ -151,6 +194,8 @@ class EnhancedDatabaseManager:
                     log_message TEXT
                 )
             ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_history_start ON run_history(start_time DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_hist_time_seg ON run_history(start_time, segment)')
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS scheduler_config (
@@ -190,6 +235,7 @@ class EnhancedDatabaseManager:
                     status TEXT DEFAULT 'completed'
                 )
             ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_download_tracking_date ON download_tracking(download_date DESC)')
             
             # Note: Consolidated tables (bot_file_downloads, scheduler_downloads, scheduler_sessions)
             # are now created by the migration functions to ensure proper handling of legacy data
@@ -201,11 +247,44 @@ class EnhancedDatabaseManager:
         """Migrate data from external databases to consolidated database"""
         self._migrate_bot_database()
         self._migrate_scheduler_database()
+        
+        # All three download tables exist now; expose them as one view
+        with self.connection() as conn:
+            conn.execute('''
+                CREATE VIEW IF NOT EXISTS unified_downloads AS
+                    SELECT 'gui' as source, file_name, segment, download_date, file_size, status
+                    FROM download_tracking
+                    UNION ALL
+                    SELECT 'bot' as source, file_name, segment, download_date, file_size, status
+                    FROM bot_file_downloads
+                    UNION ALL
+                    SELECT 'scheduler' as source, file_name, segment, download_date, file_size, status
+                    FROM scheduler_downloads
+            ''')
+    
+    @staticmethod
+    def _copy_table(src_conn, dst_cursor, src_table: str, dst_table: str) -> int:
+        """Copy every row of src_table into dst_table in batches; returns the row count"""
+        columns = [col[1] for col in src_conn.execute(f"PRAGMA table_info({src_table})")]
+        placeholders = ','.join(['?' for _ in columns])
+        sql = f"INSERT INTO {dst_table} ({','.join(columns)}) VALUES ({placeholders})"
+        
+        # Stream the source in fixed-size batches rather than fetchall(), so
+        # memory stays bounded; the caller commits once at the end
+        src_cursor = src_conn.execute(f"SELECT * FROM {src_table}")
+        copied = 0
+        while True:
+            rows = src_cursor.fetchmany(MIGRATION_BATCH_SIZE)
+            if not rows:
+                break
+            dst_cursor.executemany(sql, rows)
+            copied += len(rows)
+        return copied
     
     def _migrate_bot_database(self):
         """Migrate data from nse_download_tracking.db to main database"""
         # Always ensure the bot_file_downloads table exists
-        with sqlite3.connect(str(self.db_path)) as main_conn:
+        with self.connection() as main_conn:
             main_cursor = main_conn.cursor()
             
             # Ensure table exists regardless of migration status
@@ -225,6 +304,8 @@ class EnhancedDatabaseManager:
             ''')
             main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_file_id ON bot_file_downloads(file_id)')
             main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_segment_date ON bot_file_downloads(segment, download_date)')
+            main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_seg_fid ON bot_file_downloads(segment, file_id)')
+            main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_bot_date ON bot_file_downloads(download_date DESC)')
             main_conn.commit()
         
         # Now try to migrate legacy data if it exists
@@ -234,12 +315,12 @@ class EnhancedDatabaseManager:
             return
             
         try:
-            with sqlite3.connect(str(self.db_path)) as main_conn:
+            with self.connection() as main_conn:
                 main_cursor = main_conn.cursor()
                 
-                # Check if migration already done
-                main_cursor.execute("SELECT COUNT(*) FROM bot_file_downloads")
-                if main_cursor.fetchone()[0] > 0:
+                # Check if migration already done (any row will do)
+                main_cursor.execute("SELECT 1 FROM bot_file_downloads LIMIT 1")
+                if main_cursor.fetchone() is not None:
                     return  # Already migrated
                 
                 # Connect to bot database and copy data
@@ -254,22 +335,10 @@ class EnhancedDatabaseManager:
                     
                     if bot_cursor.fetchone():
                         # Copy data from bot database
-                        bot_cursor.execute("SELECT * FROM file_downloads")
-                        bot_data = bot_cursor.fetchall()
-                        
-                        # Get column info
-                        bot_cursor.execute("PRAGMA table_info(file_downloads)")
-                        columns = [col[1] for col in bot_cursor.fetchall()]
-                        
-                        # Insert into main database
-                        placeholders = ','.join(['?' for _ in columns])
-                        main_cursor.executemany(
-                            f"INSERT INTO bot_file_downloads ({','.join(columns)}) VALUES ({placeholders})",
-                            bot_data
-                        )
+                        copied = self._copy_table(bot_conn, main_cursor, 'file_downloads', 'bot_file_downloads')
                         
                         main_conn.commit()
-                        logging.info(f"Migrated {len(bot_data)} records from bot database")
+                        logging.info(f"Migrated {copied} records from bot database")
                         
         except Exception as e:
             logging.warning(f"Bot database migration failed: {e}")
@@ -277,7 +346,7 @@ class EnhancedDatabaseManager:
     def _migrate_scheduler_database(self):
         """Migrate data from nse_scheduler.db to main database"""
         # Always ensure the scheduler tables exist
-        with sqlite3.connect(str(self.db_path)) as main_conn:
+        with self.connection() as main_conn:
             main_cursor = main_conn.cursor()
             
             # Ensure tables exist regardless of migration status
@@ -312,6 +381,7 @@ class EnhancedDatabaseManager:
             
             main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_scheduler_file_id ON scheduler_downloads(file_id)')
             main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_scheduler_segment_date ON scheduler_downloads(segment, download_date)')
+            main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_scheduler_date ON scheduler_downloads(download_date DESC)')
             main_cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_id ON scheduler_sessions(session_id)')
             main_conn.commit()
         
@@ -322,12 +392,12 @@ class EnhancedDatabaseManager:
             return
             
         try:
-            with sqlite3.connect(str(self.db_path)) as main_conn:
+            with self.connection() as main_conn:
                 main_cursor = main_conn.cursor()
                 
-                # Check if migration already done
-                main_cursor.execute("SELECT COUNT(*) FROM scheduler_downloads")
-                if main_cursor.fetchone()[0] > 0:
+                # Check if migration already done (any row will do)
+                main_cursor.execute("SELECT 1 FROM scheduler_downloads LIMIT 1")
+                if main_cursor.fetchone() is not None:
                     return  # Already migrated
                 
                 with sqlite3.connect(str(scheduler_db_path)) as sched_conn:
@@ -340,19 +410,9 @@ class EnhancedDatabaseManager:
                     """)
                     
                     if sched_cursor.fetchone():
-                        sched_cursor.execute("SELECT * FROM downloads")
-                        downloads_data = sched_cursor.fetchall()
-                        
-                        sched_cursor.execute("PRAGMA table_info(downloads)")
-                        download_columns = [col[1] for col in sched_cursor.fetchall()]
+                        copied = self._copy_table(sched_conn, main_cursor, 'downloads', 'scheduler_downloads')
                         
-                        placeholders = ','.join(['?' for _ in download_columns])
-                        main_cursor.executemany(
-                            f"INSERT INTO scheduler_downloads ({','.join(download_columns)}) VALUES ({placeholders})",
-                            downloads_data
-                        )
-                        
-                        logging.info(f"Migrated {len(downloads_data)} download records from scheduler database")
+                        logging.info(f"Migrated {copied} download records from scheduler database")
                     
                     # Migrate sessions table
                     sched_cursor.execute("""
@@ -361,46 +421,34 @@ class EnhancedDatabaseManager:
                     """)
                     
                     if sched_cursor.fetchone():
-                        sched_cursor.execute("SELECT * FROM sessions")
-                        sessions_data = sched_cursor.fetchall()
-                        
-                        sched_cursor.execute("PRAGMA table_info(sessions)")
-                        session_columns = [col[1] for col in sched_cursor.fetchall()]
+                        copied = self._copy_table(sched_conn, main_cursor, 'sessions', 'scheduler_sessions')
                         
-                        placeholders = ','.join(['?' for _ in session_columns])
-                        main_cursor.executemany(
-                            f"INSERT INTO scheduler_sessions ({','.join(session_columns)}) VALUES ({placeholders})",
-                            sessions_data
-                        )
-                        
-                        logging.info(f"Migrated {len(sessions_data)} session records from scheduler database")
+                        logging.info(f"Migrated {copied} session records from scheduler database")
                     
                     main_conn.commit()
                     
         except Exception as e:
             logging.warning(f"Scheduler database migration failed: {e}")
     
-    def get_consolidated_download_history(self) -> List[Dict]:
-        """Get unified download history from all sources"""
+    def get_consolidated_download_history(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get unified download history from all sources, newest first (all rows unless limit is given)"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
+                # Rows keyed by column name in C, instead of zipping each row
+                # against cursor.description in Python
+                cursor.row_factory = sqlite3.Row
                 
-                # Union query to get all download records
+                # The view unions all download records; each table's date
+                # index serves the ordering. LIMIT -1 is SQLite for no limit
                 cursor.execute('''
-                    SELECT 'gui' as source, file_name, segment, download_date, file_size, status
-                    FROM download_tracking
-                    UNION ALL
-                    SELECT 'bot' as source, file_name, segment, download_date, file_size, status  
-                    FROM bot_file_downloads
-                    UNION ALL
-                    SELECT 'scheduler' as source, file_name, segment, download_date, file_size, status
-                    FROM scheduler_downloads
+                    SELECT source, file_name, segment, download_date, file_size, status
+                    FROM unified_downloads
                     ORDER BY download_date DESC
-                ''')
+                    LIMIT ?
+                ''', (-1 if limit is None else limit,))
                 
-                return [dict(zip([col[0] for col in cursor.description], row)) 
-                       for row in cursor.fetchall()]
+                return [dict(row) for row in cursor]
                        
         except Exception as e:
             logging.error(f"Error getting consolidated history: {e}")
@@ -409,27 +457,34 @@ class EnhancedDatabaseManager:
     def get_consolidated_statistics(self, days: int = 30) -> Dict:
         """Get unified statistics from all database sources"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
-                cutoff_date = datetime.now() - timedelta(days=days)
+                # A date, so the DATE columns compare against a plain 'YYYY-MM-DD'
+                cutoff_date = (datetime.now() - timedelta(days=days)).date()
                 
-                # Combined statistics query
+                # Aggregate each table on its own date index and add the three
+                # results, rather than aggregating over the unioned rows
                 cursor.execute('''
-                    SELECT COUNT(*) as total_files, SUM(file_size) as total_size
-                    FROM (
-                        SELECT file_size FROM download_tracking WHERE download_date >= ?
-                        UNION ALL
-                        SELECT file_size FROM bot_file_downloads WHERE download_date >= ?
-                        UNION ALL  
-                        SELECT file_size FROM scheduler_downloads WHERE download_date >= ?
+                    WITH gui AS (
+                        SELECT COUNT(*) AS n, TOTAL(file_size) AS size
+                        FROM download_tracking WHERE download_date >= :cutoff
+                    ), bot AS (
+                        SELECT COUNT(*) AS n, TOTAL(file_size) AS size
+                        FROM bot_file_downloads WHERE download_date >= :cutoff
+                    ), sched AS (
+                        SELECT COUNT(*) AS n, TOTAL(file_size) AS size
+                        FROM scheduler_downloads WHERE download_date >= :cutoff
                     )
-                ''', (cutoff_date, cutoff_date, cutoff_date))
+                    SELECT gui.n + bot.n + sched.n AS total_files,
+                           (gui.size + bot.size + sched.size) / 1048576.0 AS total_size_mb
+                    FROM gui, bot, sched
+                ''', {'cutoff': cutoff_date})
                 
                 result = cursor.fetchone()
                 
                 return {
                     'total_files': result[0] or 0,
-                    'total_size_mb': (result[1] or 0) / (1024 * 1024),
+                    'total_size_mb': result[1] or 0.0,
                     'sources': ['gui', 'bot', 'scheduler']
                 }
                 
@@ -453,23 +508,24 @@ class EnhancedDatabaseManager:
             ('app_title', APP_NAME, 'branding', 'Application title')
         ]
         
-        with sqlite3.connect(str(self.db_path)) as conn:
-            cursor = conn.cursor()
-            for key, value, category, description in defaults:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO settings (key, value, category, description) 
-                    VALUES (?, ?, ?, ?)
-                ''', (key, value, category, description))
+        with self.connection() as conn:
+            # One prepared statement bound for every row, in one transaction
+            conn.executemany('''
+                INSERT OR IGNORE INTO settings (key, value, category, description) 
+                VALUES (?, ?, ?, ?)
+            ''', defaults)
             conn.commit()
+        self._settings_cache = None
     
     def get_setting(self, key: str, default: str = None) -> Optional[str]:
         """Get setting value with enhanced error handling"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
-                result = cursor.fetchone()
-                return result[0] if result else default
+            # Settings are read far more often than written: load the table
+            # once and serve reads from memory (set_setting keeps it current)
+            if self._settings_cache is None:
+                with self.connection() as conn:
+                    self._settings_cache = dict(conn.execute('SELECT key, value FROM settings'))
+            return self._settings_cache.get(key, default)
         except Exception as e:
             logging.error(f"Error getting setting {key}: {e}")
             return default
@@ -477,20 +533,22 @@ class EnhancedDatabaseManager:
     def set_setting(self, key: str, value: str, category: str = 'general'):
         """Set setting with category support"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT OR REPLACE INTO settings (key, value, category, updated_at) 
                     VALUES (?, ?, ?, CURRENT_TIMESTAMP)
                 ''', (key, value, category))
                 conn.commit()
+            if self._settings_cache is not None:
+                self._settings_cache[key] = value
         except Exception as e:
             logging.error(f"Error setting {key}: {e}")
     
     def log_download_session(self, session_data: Dict):
         """Log detailed download session"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO run_history 
@@ -516,7 +574,7 @@ class EnhancedDatabaseManager:
     def get_run_statistics(self, days: int = 30) -> Dict:
         """Get comprehensive run statistics from consolidated data"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
                 cutoff_date = datetime.now() - timedelta(days=days)
                 
@@ -552,7 +610,15 @@ class NSECredentialManager:
     
     def __init__(self, db_manager: EnhancedDatabaseManager):
         self.db_manager = db_manager
+        self._creds_cache: Optional[Dict[str, str]] = None  # Decoded credentials, see get_credentials
+        self._creds_version: Optional[int] = None  # PRAGMA data_version the cache was read at
+        atexit.register(self._clear_creds_cache)
         self._load_internal_credentials()
+
+    def _clear_creds_cache(self):
+        """Drop the decoded credentials held in memory"""
+        self._creds_cache = None
+        self._creds_version = None
     
     def _load_internal_credentials(self):
         """Load credentials from secure storage or environment"""
@@ -592,7 +658,7 @@ class NSECredentialManager:
             # Simple encryption (you can enhance this)
             encrypted_password = base64.b64encode(password.encode()).decode()
             
-            with sqlite3.connect(str(self.db_manager.db_path)) as conn:
+            with self.db_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT OR REPLACE INTO credentials 
@@ -600,13 +666,27 @@ class NSECredentialManager:
                     VALUES (1, ?, ?, ?, ?, CURRENT_TIMESTAMP, 1)
                 ''', (member_code, login_id, encrypted_password, secret_key))
                 conn.commit()
+                self._creds_version = conn.execute('PRAGMA data_version').fetchone()[0]
+            self._creds_cache = {
+                'member_code': member_code,
+                'login_id': login_id,
+                'password': password,
+                'secret_key': secret_key
+            }
         except Exception as e:
             logging.error(f"Error saving credentials: {e}")
     
     def get_credentials(self) -> Optional[Dict[str, str]]:
         """Get decrypted credentials"""
         try:
-            with sqlite3.connect(str(self.db_manager.db_path)) as conn:
+            with self.db_manager.connection() as conn:
+                # data_version only moves when another connection commits, e.g.
+                # manual_control.py saving credentials; this process's own
+                # writes go through save_credentials, which refreshes the cache
+                version = conn.execute('PRAGMA data_version').fetchone()[0]
+                if self._creds_cache is not None and version == self._creds_version:
+                    return dict(self._creds_cache)
+                self._clear_creds_cache()
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT member_code, login_id, encrypted_password, secret_key 
@@ -616,12 +696,14 @@ class NSECredentialManager:
                 
                 if result:
                     decrypted_password = base64.b64decode(result[2].encode()).decode()
-                    return {
+                    self._creds_cache = {
                         'member_code': result[0],
                         'login_id': result[1],
                         'password': decrypted_password,
                         'secret_key': result[3]
                     }
+                    self._creds_version = version
+                    return dict(self._creds_cache)
         except Exception as e:
             logging.error(f"Error getting credentials: {e}")
         return None
@@ -642,6 +724,9 @@ class ProfessionalScheduler:
         self.scheduler_thread = None
         self.stop_requested = False
         self.cycle_in_progress = False
+        self._stop_event = threading.Event()  # Wakes the scheduler thread early to stop
+        self._interval = None
+        self._next_run = None
         
     def start_scheduler(self, interval_minutes: int):
         """Start the scheduler with specified interval"""
@@ -650,13 +735,11 @@ class ProfessionalScheduler:
             
             self.is_running = True
             self.stop_requested = False
-            schedule.clear()
-            
-            # Schedule the job
-            schedule.every(interval_minutes).minutes.do(self._execute_job)
+            self._stop_event.clear()
             
-            # Schedule midnight auto-shutdown
-            schedule.every().day.at("00:00").do(self._midnight_shutdown)
+            # Schedule the job (monotonic deadline); the thread also shuts down at midnight
+            self._interval = interval_minutes * 60
+            self._next_run = time.monotonic() + self._interval
             
             # Start scheduler thread
             self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
@@ -672,14 +755,34 @@ class ProfessionalScheduler:
             raise
     
     def _run_scheduler(self):
-        """Main scheduler loop"""
+        """Main scheduler loop: sleeps until the next job or midnight, not in 1 s polls"""
+        # Interval runs use monotonic deadlines; midnight is a wall-clock time,
+        # re-checked on every (capped) wake so a suspend or clock change can't delay it
+        shutdown_at = datetime.combine(datetime.now().date() + timedelta(days=1), dt_time.min)
         while self.is_running and not self.stop_requested:
             try:
-                schedule.run_pending()
-                time.sleep(1)
+                delay = min(self._next_run - time.monotonic(),
+                            (shutdown_at - datetime.now()).total_seconds(),
+                            SCHEDULER_MAX_WAIT)
+                if self._stop_event.wait(max(0.0, delay)):
+                    break  # stop_scheduler() was called
+                
+                if datetime.now() >= shutdown_at:
+                    self._midnight_shutdown()
+                    break
+                
+                if time.monotonic() < self._next_run:
+                    continue  # Woke only to re-check the wall clock
+                
+                self._execute_job()
+                self._next_run += self._interval
+                if self._next_run <= time.monotonic():
+                    # Fell behind (e.g. a long cycle): don't fire the missed runs
+                    self._next_run = time.monotonic() + self._interval
             except Exception as e:
                 logging.error(f"Scheduler error: {e}")
-                time.sleep(5)  # Wait before retrying
+                if self._stop_event.wait(5):  # Wait before retrying
+                    break
     
     def _execute_job(self):
         """Execute scheduled job with cycle completion guarantee"""
@@ -690,27 +793,23 @@ class ProfessionalScheduler:
         self.cycle_in_progress = True
         job_thread = threading.Thread(target=self._job_worker, daemon=False)
         job_thread.start()
-        
-        return schedule.CancelJob  # Cancel this specific job instance
     
     def _job_worker(self):
         """Worker thread for job execution"""
         try:
-            session_id = f"auto_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             start_time = datetime.now()
+            session_id = f"auto_{start_time:%Y%m%d_%H%M%S}"
             
             logging.info(f"Starting scheduled download cycle: {session_id}")
             
             # Execute the callback (download function)
             result = self.callback_func()
             
-            end_time = datetime.now()
-            
             # Log the session
             session_data = {
                 'session_id': session_id,
                 'start_time': start_time,
-                'end_time': end_time,
+                'end_time': datetime.now(),
                 'status': 'success' if result else 'error',
                 'segment': 'ALL',
                 'files_downloaded': result.get('files_downloaded', 0) if isinstance(result, dict) else 0,
@@ -728,11 +827,11 @@ class ProfessionalScheduler:
         """Automatic shutdown at midnight"""
         logging.info("Midnight auto-shutdown triggered")
         self.stop_scheduler()
-        return schedule.CancelJob
     
     def stop_scheduler(self, wait_for_cycle: bool = True):
         """Stop scheduler with optional cycle completion"""
         self.stop_requested = True
+        self._stop_event.set()
         
         if wait_for_cycle and self.cycle_in_progress:
             logging.info("Waiting for current cycle to complete...")
@@ -744,9 +843,10 @@ class ProfessionalScheduler:
                 time.sleep(1)
         
         self.is_running = False
-        schedule.clear()
         
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
+        # The midnight shutdown runs on the scheduler thread itself
+        if (self.scheduler_thread and self.scheduler_thread.is_alive()
+                and self.scheduler_thread is not threading.current_thread()):
             self.scheduler_thread.join(timeout=5)
         
         logging.info("Professional scheduler stopped")
@@ -756,7 +856,7 @@ class ProfessionalScheduler:
         try:
             next_run = datetime.now() + timedelta(minutes=interval_minutes)
             
-            with sqlite3.connect(str(self.db_manager.db_path)) as conn:
+            with self.db_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT OR REPLACE INTO scheduler_config 
@@ -1548,8 +1648,8 @@ Desktop shortcut has been created for easy access."""
             return {'success': False, 'message': 'Download already in progress'}
         
         self.is_download_running = True
-        session_id = f"{'manual' if manual else 'auto'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         start_time = datetime.now()
+        session_id = f"{'manual' if manual else 'auto'}_{start_time:%Y%m%d_%H%M%S}"
         
         try:
             self.update_status("Initializing download...")
@@ -1837,7 +1937,7 @@ Desktop shortcut has been created for easy access."""
     def refresh_activity_log(self):
         """Refresh activity log from database"""
         try:
-            with sqlite3.connect(str(self.db_manager.db_path)) as conn:
+            with self.db_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT start_time, status, log_message, files_downloaded 
@@ -1849,7 +1949,7 @@ Desktop shortcut has been created for easy access."""
                 self.activity_listbox.delete(0, tk.END)
                 
                 for row in cursor.fetchall():
-                    start_time = datetime.fromisoformat(row[0])
+                    start_time = row[0]
                     status = row[1]
                     message = row[2] or f"Status: {status}"
                     files = row[3] or 0
@@ -1882,7 +1982,7 @@ Desktop shortcut has been created for easy access."""
                 
                 # Last download time
                 try:
-                    with sqlite3.connect(str(self.db_manager.db_path)) as conn:
+                    with self.db_manager.connection() as conn:
                         cursor = conn.cursor()
                         cursor.execute('''
                             SELECT start_time FROM run_history 
@@ -1891,7 +1991,7 @@ Desktop shortcut has been created for easy access."""
                         ''')
                         result = cursor.fetchone()
                         if result:
-                            last_download = datetime.fromisoformat(result[0])
+                            last_download = result[0]
                             self.status_labels['last_download'].config(
                                 text=last_download.strftime('%m/%d %H:%M'))
                         else:
@@ -1948,7 +2048,7 @@ Desktop shortcut has been created for easy access."""
                 self.history_tree.delete(item)
             
             # Get recent history
-            with sqlite3.connect(str(self.db_manager.db_path)) as conn:
+            with self.db_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT id, start_time, status, segment, files_downloaded, total_size_mb
@@ -1959,7 +2059,7 @@ Desktop shortcut has been created for easy access."""
                 
                 for row in cursor.fetchall():
                     record_id = row[0]
-                    start_time = datetime.fromisoformat(row[1])
+                    start_time = row[1]
                     date_str = start_time.strftime('%Y-%m-%d')
                     time_str = start_time.strftime('%H:%M:%S')
                     status = row[2] or 'Unknown'
@@ -2000,7 +2100,7 @@ Desktop shortcut has been created for easy access."""
                 return
             
             # Delete from database
-            with sqlite3.connect(str(self.db_manager.db_path)) as conn:
+            with self.db_manager.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM run_history WHERE id = ?', (int(record_id),))
                 
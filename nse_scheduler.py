@@ -17,6 +17,7 @@ import requests
 import base64
 import gzip
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import schedule
 import shutil
 import hashlib
@@ -61,6 +62,16 @@ class Config:
     # Default segments
     SEGMENTS = ['CM', 'FO', 'SLB']
     
+    # Read/write block size for downloads and checksums
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    
+    # Concurrent downloads per segment, each pausing between its requests
+    DOWNLOAD_WORKERS = int(os.getenv('NSE_DOWNLOAD_WORKERS', '4'))
+    DOWNLOAD_DELAY = 0.5
+    
+    # Downloads logged per database transaction
+    RECORD_BATCH_SIZE = 50
+    
     @classmethod
     def validate(cls):
         """Validate configuration"""
@@ -122,9 +133,19 @@ class DatabaseManager:
         self.db_path = db_path or Config.DB_PATH
         self.init_database()
     
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for the many small download inserts"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        # WAL is set once in init_database and sticks to the file; with it,
+        # NORMAL only syncs at checkpoints rather than on every commit
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
     def init_database(self):
         """Initialize database schema - now uses consolidated database tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connect() as conn:
+            # Readers and the download workers' writers no longer block each other
+            conn.execute('PRAGMA journal_mode=WAL')
             cursor = conn.cursor()
             
             # Verify consolidated tables exist (created by EnhancedDatabaseManager)
@@ -168,13 +189,46 @@ class DatabaseManager:
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_scheduler_file_id ON scheduler_downloads(file_id)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_scheduler_segment_date ON scheduler_downloads(segment, download_date)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_session_id ON scheduler_sessions(session_id)')
-                
-                conn.commit()
+            
+            # Backs the path updates made when the organizer moves downloads
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_scheduler_file_path ON scheduler_downloads(file_path)')
+            
+            conn.commit()
+    
+    def downloaded_files(self, segment: str, download_date) -> Dict[str, Tuple[str, int]]:
+        """(file_path, file_size) recorded for each file of a segment downloaded on the given date, by file_id"""
+        try:
+            conn = self.connect()
+            try:
+                return {file_id: (file_path, file_size) for file_id, file_path, file_size in conn.execute(
+                    'SELECT file_id, file_path, file_size FROM scheduler_downloads WHERE segment = ? AND download_date = ?',
+                    (segment, download_date)
+                )}
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"Error checking download records: {e}")
+            return {}
+    
+    def update_download_paths(self, moves: List[Tuple[str, str]]):
+        """Point download records at the new location of moved files ((old, new) path pairs)"""
+        if not moves:
+            return
+        try:
+            conn = self.connect()
+            try:
+                with conn:
+                    conn.executemany('UPDATE scheduler_downloads SET file_path = ? WHERE file_path = ?',
+                                     [(new_path, old_path) for old_path, new_path in moves])
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"Error updating download paths: {e}")
     
     def log_session(self, session_data: Dict):
         """Log a backup session"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT OR REPLACE INTO scheduler_sessions 
@@ -196,24 +250,29 @@ class DatabaseManager:
     
     def log_download(self, file_data: Dict):
         """Log a file download"""
+        self.log_downloads([file_data])
+    
+    def log_downloads(self, files: List[Dict]):
+        """Log several file downloads in a single transaction"""
+        if not files:
+            return
+        today = datetime.now().date()
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+            with self.connect() as conn:
+                conn.executemany('''
                     INSERT INTO scheduler_downloads 
                     (file_id, file_name, segment, download_date, file_path, file_size, checksum, status)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                ''', [(
                     file_data.get('file_id'),
                     file_data.get('file_name'),
                     file_data.get('segment'),
-                    file_data.get('download_date', datetime.now().date()),
+                    file_data.get('download_date', today),
                     file_data.get('file_path'),
                     file_data.get('file_size', 0),
                     file_data.get('checksum', ''),
                     file_data.get('status', 'completed')
-                ))
-                conn.commit()
+                ) for file_data in files])
         except Exception as e:
             logger.error(f"Error logging download: {e}")
     
@@ -222,7 +281,7 @@ class DatabaseManager:
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Overall statistics
@@ -291,6 +350,7 @@ class NSEFileOrganizer:
             'error_files': 0,
             'segments': {}
         }
+        moves = []  # (original, organized) paths, for the download records
         
         try:
             logger.info(f"Starting file organization (dry_run: {dry_run})")
@@ -328,6 +388,7 @@ class NSEFileOrganizer:
                         
                         # Move file
                         shutil.move(str(file_path), str(target_path))
+                        moves.append((str(file_path), str(target_path)))
                         
                         # Log organization
                         self._log_organization(file_path, target_path, segment)
@@ -353,6 +414,9 @@ class NSEFileOrganizer:
         except Exception as e:
             logger.error(f"Error in file organization: {e}")
             return stats
+        finally:
+            # Later runs find today's downloads where they were moved to
+            self.db_manager.update_download_paths(moves)
     
     def _is_already_organized(self, file_path: Path) -> bool:
         """Check if file is already in organized structure"""
@@ -416,7 +480,7 @@ class NSEFileOrganizer:
     def _log_organization(self, original_path: Path, organized_path: Path, segment: str):
         """Log file organization to database"""
         try:
-            with sqlite3.connect(self.db_manager.db_path) as conn:
+            with self.db_manager.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO file_organization 
@@ -487,7 +551,13 @@ class NSEMemberBackupBot:
             status_forcelist=[429, 500, 502, 503, 504],
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # One pooled connection per download worker, so parallel downloads
+        # reuse their TLS connections instead of reconnecting
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=Config.DOWNLOAD_WORKERS,
+            pool_maxsize=Config.DOWNLOAD_WORKERS
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
@@ -613,8 +683,15 @@ class NSEMemberBackupBot:
             logger.error(f"Error getting file list for {segment}: {e}")
             return []
     
-    def download_file(self, file_info: Dict, segment: str) -> Dict:
-        """Download a single file"""
+    def download_file(self, file_info: Dict, segment: str, log: bool = True,
+                      recorded_files: Optional[Dict[str, Tuple[str, int]]] = None) -> Dict:
+        """Download a single file
+
+        With log=False the database row is returned under 'record' instead of
+        being written, so the caller can log a batch of downloads at once.
+        recorded_files is today's downloaded_files() for the segment, when the
+        caller has already loaded it.
+        """
         try:
             file_id = file_info.get('id')
             file_name = file_info.get('name', f"file_{file_id}")
@@ -624,6 +701,23 @@ class NSEMemberBackupBot:
             # Create segment directory
             segment_dir = Path(Config.DOWNLOAD_DIR) / segment
             segment_dir.mkdir(parents=True, exist_ok=True)
+            file_path = segment_dir / file_name
+            
+            # Skip the transfer and the hash if today's copy is already on disk,
+            # at its recorded path (the organizer moves files and updates it)
+            if recorded_files is None:
+                recorded_files = self.db_manager.downloaded_files(segment, datetime.now().date())
+            recorded = recorded_files.get(file_id)
+            recorded_path = Path(recorded[0]) if recorded and recorded[0] else None
+            if recorded_path is not None and recorded_path.is_file() and recorded_path.stat().st_size == recorded[1]:
+                logger.info(f"File {file_name} already downloaded today")
+                return {
+                    'success': True,
+                    'file_name': file_name,
+                    'file_path': str(recorded_path),
+                    'status': 'already_downloaded',
+                    'size': 0
+                }
             
             # Download request
             download_data = {
@@ -644,37 +738,43 @@ class NSEMemberBackupBot:
             )
             
             if response.status_code == 200:
-                file_path = segment_dir / file_name
-                total_size = 0
+                sha256_hash = hashlib.sha256()
                 
-                # Download with progress
+                # Download with progress, in 1 MiB blocks rather than 8 KiB,
+                # hashing each block as it is written instead of re-reading the file
                 with open(file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
+                    for chunk in response.iter_content(chunk_size=Config.DOWNLOAD_CHUNK_SIZE):
                         if chunk:
                             f.write(chunk)
-                            total_size += len(chunk)
+                            sha256_hash.update(chunk)
+                    total_size = f.tell()  # Bytes written, without a running count
                 
-                # Calculate checksum
-                checksum = self.calculate_checksum(file_path)
+                checksum = sha256_hash.hexdigest()
                 
-                # Log download
-                self.db_manager.log_download({
+                record = {
                     'file_id': file_id,
                     'file_name': file_name,
                     'segment': segment,
                     'file_path': str(file_path),
                     'file_size': total_size,
                     'checksum': checksum
-                })
+                }
+                
+                # Log download
+                if log:
+                    self.db_manager.log_download(record)
                 
                 logger.info(f"Successfully downloaded {file_name} ({total_size} bytes)")
                 
-                return {
+                result = {
                     'success': True,
                     'file_name': file_name,
                     'file_path': str(file_path),
                     'size': total_size
                 }
+                if not log:
+                    result['record'] = record
+                return result
             else:
                 error_msg = f"Download failed: HTTP {response.status_code}"
                 logger.error(f"Failed to download {file_name}: {error_msg}")
@@ -695,17 +795,14 @@ class NSEMemberBackupBot:
                 'error': error_msg
             }
     
-    def calculate_checksum(self, file_path: Path) -> str:
-        """Calculate SHA-256 checksum"""
-        try:
-            sha256_hash = hashlib.sha256()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
-        except Exception as e:
-            logger.error(f"Error calculating checksum: {e}")
-            return ""
+    def _download_paced(self, file_info: Dict, segment: str, recorded_files: Dict[str, Tuple[str, int]]) -> Dict:
+        """Download one file, then pause before the worker's next request"""
+        result = self.download_file(file_info, segment, log=False, recorded_files=recorded_files)
+        
+        # Small delay between downloads (skipped files made no request)
+        if result.get('status') != 'already_downloaded':
+            time.sleep(Config.DOWNLOAD_DELAY)
+        return result
     
     def download_segment(self, segment: str) -> Dict:
         """Download all files for a segment"""
@@ -727,17 +824,32 @@ class NSEMemberBackupBot:
             # Download files
             successful_downloads = 0
             failed_downloads = 0
+            pending_records = []
             
-            for file_info in files:
-                result = self.download_file(file_info, segment)
-                
-                if result['success']:
-                    successful_downloads += 1
-                else:
-                    failed_downloads += 1
+            # Today's download records for the segment, read once for every file
+            recorded_files = self.db_manager.downloaded_files(segment, datetime.now().date())
+            
+            # The requests are network-bound, so overlap them across a few
+            # workers; each worker keeps the usual pause between its requests
+            with ThreadPoolExecutor(max_workers=max(1, Config.DOWNLOAD_WORKERS)) as executor:
+                futures = [executor.submit(self._download_paced, file_info, segment, recorded_files)
+                           for file_info in files]
                 
-                # Small delay between downloads
-                time.sleep(0.5)
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result['success']:
+                        successful_downloads += 1
+                        if 'record' not in result:
+                            continue  # Already downloaded, nothing to log
+                        pending_records.append(result['record'])
+                        # Log in batches: one transaction per batch, not per file
+                        if len(pending_records) >= Config.RECORD_BATCH_SIZE:
+                            self.db_manager.log_downloads(pending_records)
+                            pending_records = []
+                    else:
+                        failed_downloads += 1
+            
+            self.db_manager.log_downloads(pending_records)
             
             logger.info(f"Segment {segment} download completed: {successful_downloads} successful, {failed_downloads} failed")
             
@@ -847,6 +959,9 @@ class EnhancedBackupScheduler:
         self.db_manager = DatabaseManager()
         self.organizer = NSEFileOrganizer()
         
+        # Kept across scheduled runs so its pooled HTTP session is reused
+        self._bot: Optional[NSEMemberBackupBot] = None
+        
         # Validate configuration
         try:
             Config.validate()
@@ -860,8 +975,9 @@ class EnhancedBackupScheduler:
             logger.info("Starting backup job...")
             
             # Run the backup
-            bot = NSEMemberBackupBot(self.db_manager)
-            backup_result = bot.run_backup()
+            if self._bot is None:
+                self._bot = NSEMemberBackupBot(self.db_manager)
+            backup_result = self._bot.run_backup()
             
             if backup_result['success']:
                 # Organize downloaded files
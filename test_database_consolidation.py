@@ -3,10 +3,37 @@
 Test script to verify database consolidation is working correctly
 """
 
+import os
+import sys
+import shutil
 import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
 from pathlib import Path
 import logging
 
+# The behaviour tests below change directory, so import the app modules by path
+sys.path.append(str(Path(__file__).resolve().parent))
+
+@contextmanager
+def _in_temp_dir():
+    """Run a block in an empty working directory, so it gets its own nse_datasync_pro.db"""
+    old_cwd = os.getcwd()
+    temp_dir = tempfile.mkdtemp(prefix="nse_test_")
+    os.chdir(temp_dir)
+    try:
+        yield Path(temp_dir)
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)  # Log handlers may still hold files open
+
+def _count(db_path, table):
+    """Row count seen through a fresh connection, i.e. what is actually committed"""
+    with sqlite3.connect(str(db_path)) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
 def test_consolidated_database():
     """Test that the consolidated database works properly"""
     print("🔍 Testing NSE DataSync Pro Database Consolidation")
@@ -103,15 +130,197 @@ def test_gui_database_manager():
         print(f"  ❌ GUI Database Manager test failed: {e}")
         return False
 
+def test_bot_download_records():
+    """Batched bot download records: buffered until flushed, written on close"""
+    print(f"\n🤖 Testing bot download records:")
+    print("-" * 30)
+    
+    from nse_backup_bot import NSEMemberBackupBot
+    
+    with _in_temp_dir() as temp_dir:
+        bot = NSEMemberBackupBot("T0001", "login", "password", "secret",
+                                 download_dir=str(temp_dir / "downloads"), verbose=False)
+        assert not bot.is_file_downloaded("file_1", "FO")
+        
+        # Below the batch size nothing is written yet, but the id set is updated
+        bot.record_download("file_1", "file_1.csv", "FO", temp_dir / "file_1.csv", 10, "abc")
+        bot.record_download("file_2", "file_2.csv", "FO", temp_dir / "file_2.csv", 20, "def")
+        assert _count(bot.db_path, "bot_file_downloads") == 0, "records written before a flush"
+        assert bot.is_file_downloaded("file_1", "FO"), "recorded id missing from the segment set"
+        assert not bot.is_file_downloaded("file_1", "CM"), "id leaked into another segment"
+        print("  ✅ Records are buffered and tracked in memory")
+        
+        # The working folder path is remembered across bot instances
+        bot._set_segment_path("FO", "/faoftp/FT0001/Onlinebackup")
+        
+        bot.close()
+        assert _count(bot.db_path, "bot_file_downloads") == 2, "close() did not flush the buffer"
+        print("  ✅ close() flushes buffered records")
+        
+        bot = NSEMemberBackupBot("T0001", "login", "password", "secret",
+                                 download_dir=str(temp_dir / "downloads"), verbose=False)
+        assert bot.is_file_downloaded("file_2", "FO"), "flushed record not found by a new bot"
+        assert bot._path_cache == {"FO": "/faoftp/FT0001/Onlinebackup"}, bot._path_cache
+        bot._set_segment_path("FO", None)
+        assert _count(bot.db_path, "segment_paths") == 0, "forgotten path still stored"
+        bot.close()
+        print("  ✅ Records and segment paths persist across bots")
+    
+    return True
+
+def test_consolidated_statistics_cutoff():
+    """A row dated exactly `days` ago is counted; the day before is not"""
+    print(f"\n📅 Testing statistics cutoff:")
+    print("-" * 30)
+    
+    from nse_datasync_gui import EnhancedDatabaseManager
+    
+    with _in_temp_dir():
+        db_manager = EnhancedDatabaseManager()
+        today = datetime.now().date()
+        cutoff = today - timedelta(days=30)
+        
+        with db_manager.connection() as conn:
+            for table in ("download_tracking", "bot_file_downloads", "scheduler_downloads"):
+                conn.executemany(
+                    f"INSERT INTO {table} (file_name, segment, download_date, file_size) VALUES (?, ?, ?, ?)",
+                    [("today.csv", "FO", today, 1048576),
+                     ("cutoff.csv", "FO", cutoff, 1048576),
+                     ("old.csv", "FO", cutoff - timedelta(days=1), 1048576)])
+        
+        stats = db_manager.get_consolidated_statistics(days=30)
+        assert stats["total_files"] == 6, stats
+        assert abs(stats["total_size_mb"] - 6.0) < 1e-9, stats
+        print("  ✅ Cutoff day included, earlier days excluded, in all three tables")
+    
+    return True
+
+def test_unified_downloads_view():
+    """History reads every source through the unified_downloads view, newest first"""
+    print(f"\n🔗 Testing unified download history:")
+    print("-" * 30)
+    
+    from nse_datasync_gui import EnhancedDatabaseManager
+    
+    with _in_temp_dir():
+        db_manager = EnhancedDatabaseManager()
+        rows = {
+            "download_tracking": date(2024, 1, 3),
+            "bot_file_downloads": date(2024, 1, 1),
+            "scheduler_downloads": date(2024, 1, 2),
+        }
+        with db_manager.connection() as conn:
+            for table, download_date in rows.items():
+                conn.execute(
+                    f"INSERT INTO {table} (file_name, segment, download_date, file_size, status) VALUES (?, ?, ?, ?, ?)",
+                    (f"{table}.csv", "CM", download_date, 100, "completed"))
+        
+        history = db_manager.get_consolidated_download_history()
+        assert [row["source"] for row in history] == ["gui", "scheduler", "bot"], history
+        assert set(history[0]) == {"source", "file_name", "segment", "download_date", "file_size", "status"}
+        print("  ✅ All three sources returned, ordered by download date")
+        
+        assert len(db_manager.get_consolidated_download_history(limit=1)) == 1
+        print("  ✅ An explicit limit bounds the result")
+    
+    return True
+
+def test_shared_connection_types():
+    """The GUI's shared connection round-trips timestamps and serializes threads"""
+    print(f"\n🧵 Testing shared GUI connection:")
+    print("-" * 30)
+    
+    from nse_datasync_gui import EnhancedDatabaseManager
+    
+    with _in_temp_dir():
+        db_manager = EnhancedDatabaseManager()
+        start_time = datetime(2024, 1, 2, 9, 15, 30, 123456)
+        
+        # Sessions are logged from the scheduler's worker threads
+        def log_sessions(worker):
+            for i in range(25):
+                db_manager.log_download_session({
+                    'session_id': f"test_{worker}_{i}",
+                    'start_time': start_time,
+                    'end_time': start_time + timedelta(minutes=1),
+                    'status': 'success',
+                    'segment': 'ALL',
+                })
+        threads = [threading.Thread(target=log_sessions, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert _count(db_manager.db_path, "run_history") == 100, "concurrent session writes were lost"
+        print("  ✅ Concurrent writers share the connection safely")
+        
+        with db_manager.connection() as conn:
+            stored = conn.execute("SELECT start_time FROM run_history LIMIT 1").fetchone()[0]
+        assert stored == start_time, f"{stored!r} != {start_time!r}"
+        print("  ✅ TIMESTAMP columns come back as datetime objects")
+    
+    return True
+
+def test_scheduler_skips_organized_download():
+    """A download the organizer has moved is still recognised and not fetched again"""
+    print(f"\n🗂️ Testing scheduler skip after organizing:")
+    print("-" * 30)
+    
+    with _in_temp_dir() as temp_dir:
+        # Imported here: the scheduler sets up its log file on import
+        from nse_scheduler import Config, DatabaseManager, NSEFileOrganizer, NSEMemberBackupBot
+        
+        Config.DOWNLOAD_DIR = str(temp_dir / "downloads")
+        Config.DB_PATH = str(temp_dir / "nse_datasync_pro.db")
+        db_manager = DatabaseManager()
+        
+        # A file downloaded and recorded the way download_segment does it
+        file_name = "FO_ORD_LOG_02012024_T0001.csv"
+        download_path = Path(Config.DOWNLOAD_DIR) / "FO" / file_name
+        download_path.parent.mkdir(parents=True)
+        download_path.write_bytes(b"x" * 128)
+        db_manager.log_downloads([{
+            'file_id': "fo_1", 'file_name': file_name, 'segment': "FO",
+            'file_path': str(download_path), 'file_size': 128, 'checksum': "abc",
+        }])
+        
+        stats = NSEFileOrganizer(Config.DOWNLOAD_DIR).organize_files()
+        assert stats['organized_files'] == 1 and not download_path.exists(), stats
+        print("  ✅ Organizer moved the download")
+        
+        # Returns before any request is made when the recorded copy is found
+        bot = NSEMemberBackupBot(db_manager)
+        result = bot.download_file({'id': "fo_1", 'name': file_name}, "FO", log=False)
+        assert result.get('status') == 'already_downloaded', result
+        assert Path(result['file_path']).is_file() and Path(result['file_path']) != download_path, result
+        print("  ✅ Organized download is skipped on the next run")
+    
+    return True
+
+def _run(test):
+    """Run one check, reporting a failed assertion instead of stopping the suite"""
+    try:
+        return test()
+    except Exception as e:
+        print(f"  ❌ {test.__name__} failed: {e!r}")
+        return False
+
 if __name__ == "__main__":
     try:
         # Run all tests
         db_test = test_consolidated_database()
         gui_test = test_gui_database_manager()
+        behaviour_tests = [_run(test) for test in (
+            test_bot_download_records,
+            test_consolidated_statistics_cutoff,
+            test_unified_downloads_view,
+            test_shared_connection_types,
+            test_scheduler_skips_organized_download,
+        )]
         
         print(f"\n🎉 Overall Result:")
         print("=" * 20)
-        if db_test and gui_test:
+        if db_test and gui_test and all(behaviour_tests):
             print("✅ Database consolidation is working perfectly!")
             print("\n💡 Benefits achieved:")
             print("  • Single database file for all operations")